@@ -0,0 +1,202 @@
+import hashlib
+import io
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from ratelimit import RateLimiter
+from summarizer import SENTENCE_RE
+
+TTS_CACHE_DIR = os.path.join(os.environ.get("PMC_CACHE_DIR", "cache"), "tts")
+
+
+def split_chunks(text, max_chars=500):
+    # Splits on lines (headings stay chunks of their own, so they cache well)
+    # and packs each line's sentences into chunks of at most max_chars
+    chunks = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        current = ""
+        for sentence in SENTENCE_RE.split(line):
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class GTTSBackend:
+    name = "gtts"
+
+    def __init__(self, lang="en", tld="com", slow=False):
+        self.lang = lang
+        self.tld = tld
+        self.slow = slow
+
+    @property
+    def host(self):
+        return f"translate.google.{self.tld}"
+
+    @property
+    def retry_on(self):
+        import requests
+        from gtts import gTTSError
+        return (gTTSError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    def cache_key(self, text):
+        return f"{self.name}|{self.lang}|{self.tld}|{self.slow}|{text}"
+
+    def synthesize(self, text):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, slow=self.slow, tld=self.tld).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class OfflineBackend:
+    # Stand-in for tests and benchmarks: returns silent MPEG-1 Layer III
+    # frames (two per word) after an optional simulated latency
+    name = "offline"
+    host = None
+    retry_on = ()
+    FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+    def __init__(self, latency=0.0, frames_per_word=2):
+        self.latency = latency
+        self.frames_per_word = frames_per_word
+
+    def cache_key(self, text):
+        return f"{self.name}|{self.frames_per_word}|{text}"
+
+    def synthesize(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.FRAME * max(1, self.frames_per_word * len(text.split()))
+
+
+TTS_BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    OfflineBackend.name: OfflineBackend,
+}
+
+
+def get_tts_backend(name=None, **kwargs):
+    name = name or os.environ.get("TTS_BACKEND", GTTSBackend.name)
+    try:
+        backend = TTS_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend '{name}', choose from: {', '.join(TTS_BACKENDS)}")
+    return backend(**kwargs)
+
+
+class AudioSynthesizer:
+    # Synthesizes text chunk by chunk on a thread pool. Every chunk is stored
+    # in a cache keyed by the hash of its text and backend settings, so
+    # repeated headings and boilerplate are synthesized only once, and the
+    # final MP3 is streamed together from the cached segments.
+    def __init__(self, backend=None, workers=4, cache_dir=TTS_CACHE_DIR, max_chars=500, limiter=None):
+        self.backend = backend if backend is not None else get_tts_backend()
+        self.limiter = limiter if limiter is not None else RateLimiter(rate=4, per_host=workers)
+        self.cache_dir = cache_dir
+        self.max_chars = max_chars
+        self.stats = {"chunks": 0, "synthesized": 0, "cached": 0}
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        # Files waiting on each in-flight segment; a failed file only cancels
+        # a segment no other file is still waiting for
+        self._waiters = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+
+    def _segment_path(self, text):
+        digest = hashlib.sha256(self.backend.cache_key(text).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.mp3")
+
+    def _synthesize_segment(self, text, path):
+        if self.backend.host is None:
+            audio = self.backend.synthesize(text)
+        else:
+            audio = self.limiter.call(self.backend.host, self.backend.synthesize, text,
+                                      retry_on=self.backend.retry_on)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        return path
+
+    def _segment(self, text):
+        # Returns (future, path) for the segment file, sharing one synthesis
+        # between concurrent requests for the same chunk. path is None when
+        # the segment was already on disk; otherwise the caller must
+        # _release() it.
+        path = self._segment_path(text)
+        with self._lock:
+            self.stats["chunks"] += 1
+            future = self._in_flight.get(path)
+            if future is not None:
+                self.stats["cached"] += 1
+                self._waiters[path] += 1
+                return future, path
+            if os.path.exists(path):
+                self.stats["cached"] += 1
+                future = Future()
+                future.set_result(path)
+                return future, None
+            self.stats["synthesized"] += 1
+            future = self._executor.submit(self._synthesize_segment, text, path)
+            self._in_flight[path] = future
+            self._waiters[path] = 1
+        future.add_done_callback(lambda _: self._forget(path))
+        return future, path
+
+    def _forget(self, path):
+        with self._lock:
+            self._in_flight.pop(path, None)
+
+    def _release(self, future, path, cancel=False):
+        with self._lock:
+            self._waiters[path] -= 1
+            if self._waiters[path]:
+                return
+            del self._waiters[path]
+        if cancel:
+            future.cancel()
+
+    def synthesize_to_file(self, text, filename):
+        segments = [self._segment(chunk) for chunk in split_chunks(text, self.max_chars)]
+        tmp_path = f"{filename}.{threading.get_ident()}.tmp"
+        failed = False
+        try:
+            with open(tmp_path, "wb") as out:
+                for segment, _ in segments:
+                    with open(segment.result(), "rb") as f:
+                        shutil.copyfileobj(f, out)
+            os.replace(tmp_path, filename)
+        except BaseException:
+            failed = True
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            for segment, path in segments:
+                if path is not None:
+                    self._release(segment, path, cancel=failed)
+
+    def summary(self):
+        stats = self.stats
+        summary = (f"Audio: {stats['chunks']} chunks, {stats['synthesized']} synthesized, "
+                   f"{stats['cached']} from cache")
+        if self.limiter.metrics["requests"]:
+            summary += f"\n{self.limiter.summary()}"
+        return summary
+
+    def close(self):
+        self._executor.shutdown()
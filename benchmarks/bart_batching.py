@@ -0,0 +1,50 @@
+# Sections/second of the batched BART summarizer for a range of batch
+# sizes, optionally with int8 dynamic quantization and a fixed thread count.
+# Needs transformers and torch; the model is downloaded on first run.
+#
+#   python -m benchmarks.bart_batching --sections 32 --batch-sizes 1 4 8 16 [--quantize]
+
+import argparse
+import time
+
+from benchmarks.pmc_server import make_article_html
+from pmc_parser import parse_sections_content
+from summarizer import BartSummarizer
+
+
+def load_sections(count):
+    sections = []
+    index = 0
+    while len(sections) < count:
+        _, section_data = parse_sections_content(make_article_html(f"PMC{4000000 + index}"))
+        sections.extend(section_data.values())
+        index += 1
+    return sections[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched BART summarization throughput")
+    parser.add_argument("--sections", type=int, default=32)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--quantize", action="store_true")
+    args = parser.parse_args()
+
+    sections = load_sections(args.sections)
+    summarizer = BartSummarizer(num_threads=args.threads, quantize=args.quantize)
+    summarizer.load()
+    summarizer.summarize_many(sections[:1])  # warm-up
+
+    results = {}
+    for batch_size in args.batch_sizes:
+        summarizer.batch_size = batch_size
+        start = time.perf_counter()
+        summarizer.summarize_many(sections)
+        elapsed = time.perf_counter() - start
+        results[batch_size] = len(sections) / elapsed
+        print(f"batch {batch_size:>3}: {len(sections) / elapsed:.2f} sections/s")
+    return results
+
+
+if __name__ == "__main__":
+    main()
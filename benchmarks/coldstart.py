@@ -0,0 +1,61 @@
+# Compares the import-time cost and peak RSS of anaesthology.py with the
+# default lazy summarizer against eagerly loading BART, the way the script
+# used to do at import.
+#
+#   python -m benchmarks.coldstart [--runs 5]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import anaesthology
+if sys.argv[1] == "bart":
+    from summarizer import BartSummarizer
+    BartSummarizer().load()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def measure(mode, runs):
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, mode], cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return {"mode": mode, "error": result.stderr.strip().splitlines()[-1]}
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "mode": mode,
+        "runs": runs,
+        "median_seconds": statistics.median(s["seconds"] for s in samples),
+        "max_rss_mb": max(s["max_rss_kb"] for s in samples) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and RSS of the lazy vs eager summarizer")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=["lazy", "bart"])
+    args = parser.parse_args()
+
+    results = [measure(mode, args.runs) for mode in args.modes]
+    for result in results:
+        if "error" in result:
+            print(f"{result['mode']:>6}: skipped ({result['error']})")
+        else:
+            print(f"{result['mode']:>6}: {result['median_seconds']:.3f}s import, {result['max_rss_mb']:.1f} MB peak RSS")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Serial fetch loop (the original behaviour) against fetch_articles with a
+# bounded worker pool, both hitting the local PMC stand-in.
+#
+#   python -m benchmarks.fetch_throughput --articles 45 --latency 0.2
+
+import argparse
+import time
+
+import requests
+
+from benchmarks.pmc_server import start_server
+from fetcher import HEADERS, article_url, fetch_articles
+
+
+def run_serial(articles, base_url):
+    for article in articles:
+        response = requests.get(article_url(article["pmc_id"], base_url), headers=HEADERS)
+        response.raise_for_status()
+
+
+def run_concurrent(articles, base_url, workers, per_host, rate):
+    for _, _, error in fetch_articles(articles, max_workers=workers, per_host=per_host,
+                                      rate=rate, base_url=base_url):
+        if error is not None:
+            raise error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch throughput against a local PMC stand-in")
+    parser.add_argument("--articles", type=int, default=45)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None)
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency=args.latency)
+    articles = [{"pmc_id": f"PMC{1000000 + i}"} for i in range(args.articles)]
+    results = {}
+    try:
+        for name, run in [
+            ("serial", lambda: run_serial(articles, base_url)),
+            ("concurrent", lambda: run_concurrent(articles, base_url, args.workers, args.per_host, args.rate)),
+        ]:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            results[name] = {"seconds": elapsed, "articles_per_second": len(articles) / elapsed}
+            print(f"{name:>10}: {elapsed:.2f}s, {len(articles) / elapsed:.1f} articles/s")
+    finally:
+        server.shutdown()
+    print(f"   speedup: {results['serial']['seconds'] / results['concurrent']['seconds']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main()
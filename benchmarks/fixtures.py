@@ -0,0 +1,56 @@
+# Corpus of recorded PMC article pages used by the offline benchmarks,
+# stored gzipped as benchmarks/fixtures/<PMCID>.html.gz.
+#
+#   python -m benchmarks.fixtures --record PMC6778496 PMC7643051   # live pages
+#   python -m benchmarks.fixtures --synthetic 12                   # no network
+
+import argparse
+import glob
+import gzip
+import os
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(path=FIXTURES_DIR):
+    # Returns {pmc_id: page bytes} in PMC ID order
+    pages = {}
+    for filename in sorted(glob.glob(os.path.join(path, "*.html*"))):
+        pmc_id = os.path.basename(filename).split(".")[0]
+        opener = gzip.open if filename.endswith(".gz") else open
+        with opener(filename, "rb") as f:
+            pages[pmc_id] = f.read()
+    return pages
+
+
+def save_fixture(pmc_id, content, path=FIXTURES_DIR):
+    os.makedirs(path, exist_ok=True)
+    filename = os.path.join(path, f"{pmc_id}.html.gz")
+    # mtime=0 keeps re-recorded identical pages byte-for-byte identical
+    with open(filename, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(content)
+    return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record PMC pages for the offline benchmarks")
+    parser.add_argument("--record", nargs="+", metavar="PMCID", help="fetch these live pages from PMC")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="generate N stand-in pages instead")
+    args = parser.parse_args()
+
+    if args.record:
+        from fetcher import fetch_article
+        for pmc_id in args.record:
+            print(save_fixture(pmc_id, fetch_article(pmc_id)))
+    elif args.synthetic:
+        from benchmarks.pmc_server import make_article_html
+        for index in range(args.synthetic):
+            pmc_id = f"PMC{9000001 + index}"
+            print(save_fixture(pmc_id, make_article_html(pmc_id, paragraphs_per_section=3 + index % 4,
+                                                         chrome=True)))
+    else:
+        parser.error("pass --record or --synthetic")
+
+
+if __name__ == "__main__":
+    main()
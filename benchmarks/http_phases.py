@@ -0,0 +1,69 @@
+# Connection overhead of one-off requests.get calls (a new TCP connection
+# and no compression per article, as get_sections_content used to do)
+# against the pooled, compressed session, broken into DNS/connect/TTFB/
+# transfer phases against the local PMC stand-in.
+#
+#   python -m benchmarks.http_phases --articles 45 --workers 4
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.pmc_server import start_server
+from fetcher import HEADERS, article_url
+from httpclient import PooledSession
+
+
+def run(get, urls, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for response in executor.map(lambda url: get(url, headers=HEADERS), urls):
+            response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP phase timings, one-off vs pooled session")
+    parser.add_argument("--articles", type=int, default=45)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--host", default="127.0.0.1", help="use 'localhost' to include a DNS lookup")
+    args = parser.parse_args()
+
+    server, base_url = start_server()
+    base_url = base_url.replace("127.0.0.1", args.host)
+    urls = [article_url(f"PMC{3000000 + i}", base_url) for i in range(args.articles)]
+    results = {}
+    try:
+        def one_off(url, headers):
+            # A fresh session per call: new connection, identity encoding
+            with PooledSession(pool_size=1) as session:
+                session.headers["Accept-Encoding"] = "identity"
+                response = session.get(url, headers=headers)
+                timings.extend(session.timings)
+                return response
+
+        timings = []
+        elapsed = run(one_off, urls, args.workers)
+        results["one-off"] = (elapsed, timings)
+
+        pooled = PooledSession(pool_size=args.workers)
+        elapsed = run(pooled.get, urls, args.workers)
+        results["pooled"] = (elapsed, list(pooled.timings))
+    finally:
+        server.shutdown()
+
+    report = {}
+    for name, (elapsed, timings) in results.items():
+        phases = {phase: sum(t[phase] for t in timings) / len(timings) * 1000
+                  for phase in ("dns", "connect", "ttfb", "transfer")}
+        wire = sum(t["wire_bytes"] for t in timings)
+        reused = sum(t["reused"] for t in timings)
+        report[name] = {"seconds": elapsed, "reused": reused, "wire_bytes": wire,
+                        **{f"{phase}_ms": value for phase, value in phases.items()}}
+        print(f"{name:>8}: {elapsed:.2f}s, {reused}/{len(timings)} reused, {wire / 1024:.0f} KiB on the wire, "
+              + ", ".join(f"{phase} {value:.2f}ms" for phase, value in phases.items()))
+    return report
+
+
+if __name__ == "__main__":
+    main()
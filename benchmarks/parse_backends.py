@@ -0,0 +1,55 @@
+# Pages/second of each parser backend, with and without streaming
+# extraction, over saved PMC pages (or canned stand-in pages). Every
+# backend's output is checked against the html.parser baseline.
+#
+#   python -m benchmarks.parse_backends [--pages DIR] [--pool 4]
+
+import argparse
+import time
+
+from benchmarks.fixtures import load_fixtures
+from benchmarks.pmc_server import make_article_html
+from pmc_parser import ParsePool, available_backends, parse_sections_content
+
+
+def load_pages(path, count):
+    if path:
+        # Recorded fixtures are gzipped; plain .html pages load as well
+        return list(load_fixtures(path).values())
+    return [make_article_html(f"PMC{2000000 + i}") for i in range(count)]
+
+
+def bench(pages, backend, streaming, pool_workers):
+    start = time.perf_counter()
+    if pool_workers:
+        with ParsePool(pool_workers, backend=backend, streaming=streaming) as pool:
+            results = [future.result() for future in [pool.submit(page) for page in pages]]
+    else:
+        results = [parse_sections_content(page, backend, streaming) for page in pages]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser backend throughput")
+    parser.add_argument("--pages", help="directory of saved PMC pages (.html or .html.gz)")
+    parser.add_argument("--count", type=int, default=50, help="canned pages when --pages is not given")
+    parser.add_argument("--pool", type=int, default=0, help="parse in a process pool of this size")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.count)
+    baseline = [parse_sections_content(page) for page in pages]
+    results = {}
+    for backend in available_backends():
+        for streaming in (False, True):
+            if backend == "selectolax" and streaming:
+                continue
+            elapsed, parsed = bench(pages, backend, streaming, args.pool)
+            name = f"{backend}{' streaming' if streaming else ''}"
+            results[name] = {"pages_per_second": len(pages) / elapsed, "identical": parsed == baseline}
+            print(f"{name:>22}: {len(pages) / elapsed:7.1f} pages/s"
+                  f"{'' if parsed == baseline else '  (output differs from html.parser)'}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# Local stand-in for the PMC article pages. Serves canned HTML in the
+# classic PMC markup (.abstract-content / .tsec) with an optional artificial
+# latency, keep-alive, gzip, ETag revalidation and injected 429/503
+# errors, so fetch benchmarks never touch NCBI.
+#
+#   python -m benchmarks.pmc_server --port 8765 --latency 0.2
+#   PMC_BASE_URL=http://127.0.0.1:8765/pmc/articles/ python anaesthology.py
+
+import argparse
+import gzip
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "patients anaesthesia airway perioperative outcome cohort randomized trial "
+    "ventilation sedation analgesia residents training survey consensus "
+    "intensive care mortality incidence burnout competency guideline"
+).split()
+
+SECTION_TITLES = [
+    "Introduction", "Methods", "Results", "Discussion", "Conclusions",
+    "Funding", "Competing interests", "References",
+]
+
+
+def _sentence(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng, sentences=6):
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _chrome(rng, links=150):
+    # Navigation and sidebar markup that real PMC pages carry around the article
+    items = "".join(f'<li><a href="/pmc/?term={rng.choice(WORDS)}">{_sentence(rng)}</a></li>' for _ in range(links))
+    return f'<header class="ncbi-header"><nav><ul>{items}</ul></nav></header>'
+
+
+def _references(rng, count=60):
+    items = "".join(
+        f'<li><span class="element-citation">{_sentence(rng)} <a href="https://doi.org/10.{rng.randint(1000, 9999)}'
+        f'/{rng.randint(10000, 99999)}">doi</a></span></li>' for _ in range(count))
+    return f'<div class="tsec sec"><h2>References</h2><ul class="back-ref-list">{items}</ul></div>'
+
+
+def make_article_html(pmc_id, paragraphs_per_section=4, chrome=False):
+    # chrome=True wraps the article in navigation, figure captions and a
+    # reference list, roughly matching the size and shape of a real page
+    rng = random.Random(pmc_id)
+    sections = "".join(
+        f'<div class="tsec sec"><h2>{title}</h2>'
+        + "".join(f"<p>{_paragraph(rng)}</p>"
+                  for _ in range(paragraphs_per_section * (3 if chrome and title == "Methods" else 1)))
+        + (f'<div class="fig"><div class="caption"><p>{_sentence(rng)}</p></div></div>' if chrome else "")
+        + "</div>"
+        for title in SECTION_TITLES
+    )
+    return (
+        f"<html><head><title>{pmc_id}</title></head><body>"
+        + (_chrome(rng) if chrome else "")
+        + f'<div class="abstract-content"><p>{_paragraph(rng)}</p></div>'
+        + sections
+        + (_references(rng) if chrome else "")
+        + "</body></html>"
+    ).encode("utf-8")
+
+
+class PMCHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY a
+    # reused connection stalls on delayed ACKs
+    disable_nagle_algorithm = True
+    latency = 0.0
+    error_rate = 0.0
+    pages = {}
+    fixtures = []
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("/") if part]
+        if len(parts) < 3 or parts[:2] != ["pmc", "articles"]:
+            self.send_error(404)
+            return
+        pmc_id = parts[2]
+        if pmc_id not in self.pages:
+            if self.fixtures:
+                # Recorded pages are reused round-robin for unknown IDs
+                self.pages[pmc_id] = self.fixtures[sum(pmc_id.encode()) % len(self.fixtures)]
+            else:
+                self.pages[pmc_id] = make_article_html(pmc_id)
+        body = self.pages[pmc_id]
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_response(random.choice([429, 503]))
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0.0, error_rate=0.0, fixtures=None, handler=PMCHandler):
+    # Returns (server, base_url); the server runs on a daemon thread.
+    # `fixtures` maps PMC IDs to recorded page bytes.
+    fixtures = fixtures or {}
+    handler = type("Handler", (handler,), {"latency": latency, "error_rate": error_rate, "pages": dict(fixtures),
+                                           "fixtures": list(fixtures.values())})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/pmc/articles/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for PMC article pages")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 429/503")
+    parser.add_argument("--fixtures", action="store_true", help="serve the recorded pages in benchmarks/fixtures")
+    args = parser.parse_args()
+
+    fixtures = None
+    if args.fixtures:
+        from benchmarks.fixtures import load_fixtures
+        fixtures = load_fixtures()
+    server, base_url = start_server(args.port, args.latency, args.error_rate, fixtures)
+    print(f"Serving canned PMC pages at {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
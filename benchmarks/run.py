@@ -0,0 +1,258 @@
+# Offline benchmark suite. Every benchmark runs against the recorded pages
+# in benchmarks/fixtures, served by the local PMC stand-in, with the
+# offline TTS backend, so nothing touches NCBI or Google. Results are
+# written to benchmarks/results/<commit>.json for comparison across commits.
+#
+#   python -m benchmarks.run [--only parse pdf] [--articles 48]
+#   python -m benchmarks.run --compare benchmarks/results/abc123.json benchmarks/results/def456.json
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+from benchmarks.fixtures import load_fixtures  # noqa: E402
+from benchmarks.pmc_server import start_server  # noqa: E402
+
+
+@contextlib.contextmanager
+def _in_directory(path):
+    # Output paths in anaesthology.py are relative to the working directory
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _timed(func, repeat=3):
+    # Best of `repeat` runs, which is the most stable figure on a noisy machine
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_fetch(pages, articles, latency=0.02, workers=8):
+    from fetcher import fetch_articles
+
+    server, base_url = start_server(latency=latency, fixtures=pages)
+    ids = [{"pmc_id": f"PMC{5000000 + i}"} for i in range(articles)]
+    try:
+        def run():
+            for _, _, error in fetch_articles(ids, max_workers=workers, per_host=workers, base_url=base_url):
+                if error is not None:
+                    raise error
+        elapsed = _timed(run)
+    finally:
+        server.shutdown()
+    return {"articles_per_second": articles / elapsed, "latency_seconds": latency, "workers": workers}
+
+
+def bench_parse(pages):
+    from pmc_parser import available_backends, parse_sections_content
+
+    contents = list(pages.values())
+    results = {}
+    for backend in available_backends():
+        for streaming in ((False, True) if backend != "selectolax" else (False,)):
+            elapsed = _timed(lambda: [parse_sections_content(page, backend, streaming) for page in contents])
+            results[f"{backend}{'-streaming' if streaming else ''}_pages_per_second"] = len(contents) / elapsed
+    return results
+
+
+def _sections(pages):
+    from pmc_parser import parse_sections_content
+
+    sections = []
+    for page in pages.values():
+        abstract, section_data = parse_sections_content(page)
+        sections.append(abstract)
+        sections.extend(section_data.values())
+    return sections
+
+
+def _complete_sentence_reference(summary, max_word_count=50):
+    # complete_sentence as originally written, to measure the speedup against
+    import re
+
+    sentences = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s', summary)
+    word_count = 0
+    selected_sentences = []
+    for sentence in sentences:
+        words = sentence.split()
+        if word_count + len(words) <= max_word_count:
+            selected_sentences.append(sentence)
+            word_count += len(words)
+        else:
+            break
+    return " ".join(selected_sentences)
+
+
+def bench_complete_sentence(pages):
+    from benchmarks.pmc_server import make_article_html
+    from pmc_parser import parse_sections_content
+    from summarizer import complete_sentences
+
+    sections = _sections(pages) * 20
+    # Long methods sections, as found on real pages
+    methods = [parse_sections_content(make_article_html(f"PMC{5000000 + index}", paragraphs_per_section=24,
+                                                        chrome=True))[1]["Methods"] for index in range(20)] * 10
+
+    elapsed = _timed(lambda: complete_sentences(sections, max_word_count=50))
+    reference = _timed(lambda: [_complete_sentence_reference(section, 50) for section in sections])
+    methods_elapsed = _timed(lambda: complete_sentences(methods, max_word_count=50))
+    methods_reference = _timed(lambda: [_complete_sentence_reference(section, 50) for section in methods])
+    return {"sections_per_second": len(sections) / elapsed, "speedup": reference / elapsed,
+            "methods_sections_per_second": len(methods) / methods_elapsed,
+            "methods_speedup": methods_reference / methods_elapsed}
+
+
+def bench_pdf(pages):
+    from anaesthology import combined_pdf_path, generate_pdf
+    from pdf_renderer import PdfRenderPool, render_category_pdf
+    from pmc_parser import parse_sections_content
+
+    parsed = [parse_sections_content(page) for page in pages.values()]
+    with tempfile.TemporaryDirectory() as tmp, _in_directory(tmp):
+        def run(pool=None):
+            for index, (abstract, section_data) in enumerate(parsed):
+                generate_pdf("benchmark", f"Article {index}", "A. Author", "", abstract, section_data, pool=pool)
+
+        def run_pooled(pool):
+            futures = [pool.submit(os.path.join("output", "benchmark", f"pooled_{index}.pdf"), "benchmark",
+                                   f"Article {index}", "A. Author", "", abstract, section_data)
+                       for index, (abstract, section_data) in enumerate(parsed)]
+            for future in futures:
+                future.result()
+
+        def run_combined():
+            render_category_pdf(combined_pdf_path("benchmark"), "benchmark",
+                                ((f"Article {index}", "A. Author", "", abstract, section_data)
+                                 for index, (abstract, section_data) in enumerate(parsed)))
+
+        elapsed = _timed(run)
+        with PdfRenderPool() as pool:
+            pool.render(os.path.join("output", "benchmark", "warmup.pdf"), "benchmark", "Warmup", "", "", "", {})
+            pooled = _timed(lambda: run_pooled(pool))
+        combined = _timed(run_combined)
+    return {"seconds_per_pdf": elapsed / len(parsed), "seconds_per_pdf_pooled": pooled / len(parsed),
+            "seconds_per_pdf_combined": combined / len(parsed)}
+
+
+def bench_pipeline(pages, articles, latency=0.02):
+    import anaesthology
+    import fetcher
+    from audio import AudioSynthesizer, OfflineBackend
+    from ratelimit import RateLimiter
+    from registry import ArticleRegistry
+
+    server, base_url = start_server(latency=latency, fixtures=pages)
+    registry = ArticleRegistry({"pmc_id": f"PMC{6000000 + i}", "title": f"Benchmark article {i}",
+                                "authors": "A. Author", "doi": "", "year": "2024", "category": "benchmark"}
+                               for i in range(articles))
+    previous_base_url = fetcher.PMC_BASE_URL
+    fetcher.PMC_BASE_URL = base_url
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp, _in_directory(tmp):
+            for run in ("cold", "warm"):
+                resources = anaesthology.BatchResources(
+                    registry=registry, limiter=RateLimiter(rate=None, per_host=8),
+                    tts=AudioSynthesizer(OfflineBackend(), cache_dir=os.path.join(tmp, "tts")))
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    anaesthology.run_batch(["benchmark"], resources)
+                elapsed = time.perf_counter() - start
+                results[f"{run}_articles_per_minute"] = articles / elapsed * 60
+    finally:
+        fetcher.PMC_BASE_URL = previous_base_url
+        server.shutdown()
+    return results
+
+
+BENCHMARKS = ("fetch", "parse", "complete_sentence", "pdf", "pipeline")
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'metric':<52} {old['commit']:>12} {new['commit']:>12} {'change':>8}")
+    for name, metrics in new["benchmarks"].items():
+        for metric, value in metrics.items():
+            before = old["benchmarks"].get(name, {}).get(metric)
+            if not isinstance(value, float) or not before:
+                continue
+            # seconds_* metrics are better when lower, everything else when higher
+            change = (before / value if metric.startswith("seconds") else value / before) - 1
+            print(f"{name + '.' + metric:<52} {before:>12.2f} {value:>12.2f} {change:>+8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite over recorded PMC pages")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--articles", type=int, default=48, help="articles for the fetch and pipeline benchmarks")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    pages = load_fixtures()
+    if not pages:
+        raise SystemExit("No fixtures found; run python -m benchmarks.fixtures first")
+
+    runners = {
+        "fetch": lambda: bench_fetch(pages, args.articles),
+        "parse": lambda: bench_parse(pages),
+        "complete_sentence": lambda: bench_complete_sentence(pages),
+        "pdf": lambda: bench_pdf(pages),
+        "pipeline": lambda: bench_pipeline(pages, args.articles),
+    }
+    results = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "fixtures": len(pages),
+        "benchmarks": {},
+    }
+    for name in args.only:
+        results["benchmarks"][name] = runners[name]()
+        print(f"{name}: " + ", ".join(f"{metric} {value:.2f}" if isinstance(value, float) else f"{metric} {value}"
+                                      for metric, value in results["benchmarks"][name].items()))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
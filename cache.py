@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.environ.get("PMC_CACHE_DIR", "cache")
+
+
+def content_digest(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+class ArticleCache:
+    # On-disk cache of raw PMC responses and their parsed sections.
+    #
+    # Raw pages are stored content-addressed under blobs/ and indexed by PMC
+    # ID in a small SQLite database together with their ETag/Last-Modified
+    # validators. Entries younger than `ttl` seconds are served without
+    # touching the network; older ones are revalidated with a conditional
+    # GET. Parsed (abstract, section_data) results are keyed by the page
+    # digest and the parser's `key` (its section rules), so an unchanged page
+    # is never parsed twice under the same rules. When the blobs exceed
+    # `max_bytes` the least recently used entries are evicted.
+    def __init__(self, path=CACHE_DIR, ttl=7 * 24 * 3600, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "parse_hits": 0,
+                      "bytes_fetched": 0, "bytes_saved": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(path, "blobs"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                pmc_id TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+            CREATE TABLE IF NOT EXISTS parsed (
+                digest TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+        """)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.path, "blobs", digest[:2], digest)
+
+    def lookup(self, pmc_id):
+        # Returns (content, fresh, validators) or None when nothing is cached
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, etag, last_modified, fetched_at FROM responses WHERE pmc_id = ?",
+                (pmc_id,)).fetchone()
+        if row is None:
+            return None
+        digest, etag, last_modified, fetched_at = row
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        fresh = time.time() - fetched_at < self.ttl
+        validators = {}
+        if etag:
+            validators["If-None-Match"] = etag
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        return content, fresh, validators
+
+    def record_hit(self, pmc_id, content, revalidated=False):
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self.stats["revalidated"] += 1
+                self._db.execute("UPDATE responses SET fetched_at = ?, last_access = ? WHERE pmc_id = ?",
+                                 (now, now, pmc_id))
+            else:
+                self.stats["hits"] += 1
+                self._db.execute("UPDATE responses SET last_access = ? WHERE pmc_id = ?", (now, pmc_id))
+            self._db.commit()
+            self.stats["bytes_saved"] += len(content)
+
+    def store(self, pmc_id, content, etag=None, last_modified=None):
+        digest = content_digest(content)
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, blob_path)
+        now = time.time()
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["bytes_fetched"] += len(content)
+            previous = self._db.execute("SELECT digest FROM responses WHERE pmc_id = ?", (pmc_id,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (pmc_id, digest, etag, last_modified, now, now, len(content)))
+            if previous is not None and previous[0] != digest:
+                # The page changed; its old copy is no longer counted by evict()
+                self._discard(previous[0])
+            self._db.commit()
+        self.evict()
+        return digest
+
+    def parse(self, content, parser, key=""):
+        # Returns parser(content), reusing the stored result for an identical
+        # page parsed with the same key
+        digest = f"{content_digest(content)}:{key}" if key else content_digest(content)
+        with self._lock:
+            row = self._db.execute("SELECT data FROM parsed WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            with self._lock:
+                self.stats["parse_hits"] += 1
+            abstract, section_data = json.loads(row[0])
+            return abstract, section_data
+        abstract, section_data = parser(content)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO parsed VALUES (?, ?)",
+                             (digest, json.dumps([abstract, section_data])))
+            self._db.commit()
+        return abstract, section_data
+
+    def evict(self):
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._db.execute(
+                "SELECT pmc_id, digest, size FROM responses ORDER BY last_access").fetchall()
+            for pmc_id, digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM responses WHERE pmc_id = ?", (pmc_id,))
+                self._discard(digest)
+                total -= size
+            self._db.commit()
+
+    def _discard(self, digest):
+        # Removes a page's blob and parse results once no PMC ID refers to
+        # it; called with the lock held
+        if self._db.execute("SELECT 1 FROM responses WHERE digest = ?", (digest,)).fetchone() is not None:
+            return
+        # Parse results under any key; ";" sorts right after ":"
+        self._db.execute("DELETE FROM parsed WHERE digest = ? OR (digest > ? AND digest < ?)",
+                         (digest, f"{digest}:", f"{digest};"))
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def summary(self):
+        stats = self.stats
+        return (f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+                f"{stats['misses']} misses, {stats['parse_hits']} parse hits, "
+                f"{stats['bytes_fetched'] / 1024:.0f} KiB fetched, "
+                f"{stats['bytes_saved'] / 1024:.0f} KiB saved")
+
+    def close(self):
+        self._db.close()
+
+
+class SummaryCache:
+    # Persistent summaries keyed by the hash of the section text together
+    # with the summarizer backend and its parameters, bounded to
+    # `max_entries` rows with least recently used eviction
+    def __init__(self, path=os.path.join(CACHE_DIR, "summaries.sqlite"), max_entries=200_000):
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS summaries_last_access ON summaries (last_access);
+        """)
+
+    @staticmethod
+    def key(text, backend, params):
+        encoded = json.dumps([backend, params, text], sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for offset in range(0, len(keys), 500):
+                batch = keys[offset:offset + 500]
+                placeholders = ", ".join("?" * len(batch))
+                found.update(self._db.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})", batch))
+            if found:
+                self._db.executemany("UPDATE summaries SET last_access = ? WHERE key = ?",
+                                     [(time.time(), key) for key in found])
+                self._db.commit()
+            self.stats["hits"] += sum(1 for key in keys if key in found)
+            self.stats["misses"] += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)",
+                                 [(key, summary, now) for key, summary in items])
+            count = self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM summaries WHERE key IN "
+                    "(SELECT key FROM summaries ORDER BY last_access LIMIT ?)", (count - self.max_entries,))
+            self._db.commit()
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def summary(self):
+        return (f"Summary cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+                f"{self.hit_rate():.0%} hit rate")
+
+    def close(self):
+        self._db.close()
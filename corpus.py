@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+from cache import CACHE_DIR
+from registry import parse_year
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = ("zstd", "zlib") if zstandard is not None else ("zlib",)
+
+
+def article_digest(article, abstract, section_data):
+    # Hash of everything stored for an article after section filtering, so
+    # rule changes and newly learned boilerplate replace the stored copy
+    payload = [[article.get(field) for field in ("category", "title", "authors", "year")],
+               abstract, list(section_data.items())]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class _Codec:
+    # zstd when the zstandard package is installed, zlib otherwise. zstd
+    # compressor objects are not thread-safe, so each thread gets its own.
+    def __init__(self, name, level=None):
+        if name == "zstd" and zstandard is None:
+            raise RuntimeError("this corpus is zstd-compressed; install the zstandard package to read it")
+        if name not in ("zstd", "zlib"):
+            raise ValueError(f"Unknown codec: {name}")
+        self.name = name
+        self.level = level if level is not None else (6 if name == "zlib" else 3)
+        self._local = threading.local()
+
+    def compress(self, text):
+        data = text.encode("utf-8")
+        if self.name == "zlib":
+            return zlib.compress(data, self.level)
+        if not hasattr(self._local, "compressor"):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return self._local.compressor.compress(data)
+
+    def decompress(self, blob):
+        if self.name == "zlib":
+            return zlib.decompress(blob).decode("utf-8")
+        if not hasattr(self._local, "decompressor"):
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return self._local.decompressor.decompress(blob).decode("utf-8")
+
+
+class CorpusStore:
+    # Parsed articles kept across runs, one row per (pmc_id, section_title,
+    # content) with the text compressed. Article metadata and the abstract
+    # live in `articles`; a digest of the stored content lets an unchanged
+    # article skip the write. The database runs in WAL mode and every reader gets its own
+    # connection with mmap enabled, so iter_sections/iter_articles stream
+    # rows straight from the mapped file while the pipeline keeps writing,
+    # without loading the corpus into memory.
+    def __init__(self, path=os.path.join(CACHE_DIR, "corpus.sqlite"), codec=None, level=None,
+                 mmap_size=256 * 1024 * 1024):
+        self.path = path
+        self.mmap_size = mmap_size
+        self.stats = {"written": 0, "unchanged": 0, "text_bytes": 0, "stored_bytes": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                pmc_id TEXT PRIMARY KEY,
+                category TEXT,
+                title TEXT,
+                authors TEXT,
+                year INTEGER,
+                digest TEXT,
+                abstract BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_category ON articles (category, pmc_id);
+            CREATE TABLE IF NOT EXISTS sections (
+                pmc_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                section_title TEXT NOT NULL,
+                content BLOB NOT NULL,
+                PRIMARY KEY (pmc_id, position)
+            );
+        """)
+        # The codec is fixed when the store is created
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'codec'").fetchone()
+        if row is None:
+            self._db.execute("INSERT INTO meta VALUES ('codec', ?)", (codec or CODECS[0],))
+            self._db.commit()
+            row = (codec or CODECS[0],)
+        self.codec = _Codec(row[0], level)
+
+    def has(self, pmc_id, digest):
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM articles WHERE pmc_id = ?", (pmc_id,)).fetchone()
+        return row is not None and digest is not None and row[0] == digest
+
+    def add(self, article, abstract, section_data):
+        # Replaces whatever was stored for the article; returns False when the
+        # stored copy is identical
+        pmc_id = article["pmc_id"]
+        digest = article_digest(article, abstract, section_data)
+        if self.has(pmc_id, digest):
+            with self._lock:
+                self.stats["unchanged"] += 1
+            return False
+        abstract_blob = self.codec.compress(abstract)
+        rows = [(pmc_id, position, title, self.codec.compress(content))
+                for position, (title, content) in enumerate(section_data.items())]
+        text_bytes = len(abstract.encode("utf-8")) + sum(len(content.encode("utf-8"))
+                                                          for content in section_data.values())
+        with self._lock:
+            self._db.execute("DELETE FROM sections WHERE pmc_id = ?", (pmc_id,))
+            self._db.execute("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (pmc_id, article.get("category"), article.get("title"), article.get("authors"),
+                              parse_year(article.get("year")), digest, abstract_blob))
+            self._db.executemany("INSERT INTO sections VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+            self.stats["written"] += 1
+            self.stats["text_bytes"] += text_bytes
+            self.stats["stored_bytes"] += len(abstract_blob) + sum(len(row[3]) for row in rows)
+        return True
+
+    def get(self, pmc_id):
+        # Returns (abstract, section_data) or None
+        with self._lock:
+            row = self._db.execute("SELECT abstract FROM articles WHERE pmc_id = ?", (pmc_id,)).fetchone()
+            if row is None:
+                return None
+            sections = self._db.execute(
+                "SELECT section_title, content FROM sections WHERE pmc_id = ? ORDER BY position",
+                (pmc_id,)).fetchall()
+        return (self.codec.decompress(row[0]),
+                {title: self.codec.decompress(content) for title, content in sections})
+
+    def _reader(self):
+        db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        db.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return db
+
+    @staticmethod
+    def _where(category):
+        # pmc_ids are filtered in Python; an IN list would hit SQLite's
+        # bound-parameter limit on large categories
+        return (" WHERE a.category = ?", [category]) if category is not None else ("", [])
+
+    def iter_sections(self, category=None, pmc_ids=None):
+        # Yields (pmc_id, section_title, content) one row at a time
+        where, params = self._where(category)
+        pmc_ids = set(pmc_ids) if pmc_ids is not None else None
+        db = self._reader()
+        try:
+            rows = db.execute(
+                "SELECT s.pmc_id, s.section_title, s.content FROM sections s "
+                f"JOIN articles a ON a.pmc_id = s.pmc_id{where} ORDER BY s.pmc_id, s.position", params)
+            for pmc_id, title, content in rows:
+                if pmc_ids is not None and pmc_id not in pmc_ids:
+                    continue
+                yield pmc_id, title, self.codec.decompress(content)
+        finally:
+            db.close()
+
+    def iter_articles(self, category=None, pmc_ids=None):
+        # Yields (article, abstract, section_data), holding one article at a time
+        where, params = self._where(category)
+        pmc_ids = set(pmc_ids) if pmc_ids is not None else None
+        db = self._reader()
+        try:
+            articles = db.execute(
+                f"SELECT a.pmc_id, a.category, a.title, a.authors, a.year, a.abstract FROM articles a{where} "
+                "ORDER BY a.pmc_id", params)
+            for pmc_id, category_, title, authors, year, abstract in articles:
+                if pmc_ids is not None and pmc_id not in pmc_ids:
+                    continue
+                sections = db.execute(
+                    "SELECT section_title, content FROM sections WHERE pmc_id = ? ORDER BY position", (pmc_id,))
+                article = {"pmc_id": pmc_id, "category": category_, "title": title, "authors": authors,
+                           "year": year}
+                yield (article, self.codec.decompress(abstract),
+                       {title: self.codec.decompress(content) for title, content in sections})
+        finally:
+            db.close()
+
+    def summary(self):
+        with self._lock:
+            articles, sections = self._db.execute(
+                "SELECT (SELECT COUNT(*) FROM articles), (SELECT COUNT(*) FROM sections)").fetchone()
+        stats = self.stats
+        ratio = stats["text_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0.0
+        return (f"Corpus: {articles} articles, {sections} sections ({self.codec.name}), "
+                f"{stats['written']} written, {stats['unchanged']} unchanged, "
+                f"{stats['text_bytes'] / 1024:.0f} KiB text stored in {stats['stored_bytes'] / 1024:.0f} KiB "
+                f"({ratio:.1f}x)")
+
+    def close(self):
+        self._db.close()
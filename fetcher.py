@@ -0,0 +1,77 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+from httpclient import default_session
+from ratelimit import RateLimiter
+
+PMC_BASE_URL = os.environ.get("PMC_BASE_URL", "https://www.ncbi.nlm.nih.gov/pmc/articles/")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"}
+
+
+def article_url(pmc_id, base_url=None):
+    base_url = base_url or PMC_BASE_URL
+    return f"{base_url.rstrip('/')}/{pmc_id}/"
+
+
+def fetch_article(pmc_id, base_url=None, limiter=None, cache=None, session=None):
+    cached = cache.lookup(pmc_id) if cache is not None else None
+    headers = HEADERS
+    if cached is not None:
+        content, fresh, validators = cached
+        if fresh:
+            cache.record_hit(pmc_id, content)
+            return content
+        headers = {**HEADERS, **validators}
+
+    url = article_url(pmc_id, base_url)
+    get = (session if session is not None else default_session()).get
+    if limiter is None:
+        response = get(url, headers=headers)
+    else:
+        response = limiter.request(url, get, headers=headers,
+                                   retry_on=(requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    if cached is not None and response.status_code == 304:
+        cache.record_hit(pmc_id, content, revalidated=True)
+        return content
+    response.raise_for_status()
+    if cache is not None:
+        cache.store(pmc_id, response.content, response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"))
+    return response.content
+
+
+def fetch_articles(articles, max_workers=8, per_host=4, rate=None, base_url=None, limiter=None):
+    # Yields (article, content, error) in completion order. At most
+    # 2 * max_workers fetches are in flight so a slow consumer bounds memory.
+    if limiter is None:
+        limiter = RateLimiter(rate=rate, per_host=per_host)
+    articles = iter(articles)
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch") as executor:
+        def submit_next():
+            for article in articles:
+                future = executor.submit(fetch_article, article["pmc_id"], base_url, limiter)
+                future.article = article
+                pending.append(future)
+                return True
+            return False
+
+        while len(pending) < 2 * max_workers and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                try:
+                    yield future.article, future.result(), None
+                except requests.exceptions.RequestException as e:
+                    yield future.article, None, e
+                submit_next()
@@ -0,0 +1,185 @@
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    pass
+
+
+# Connection setup times of the request running on the current thread
+_phases = threading.local()
+
+
+def _reset_phases():
+    _phases.dns = 0.0
+    _phases.connect = 0.0
+    _phases.new_connection = False
+
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        # Resolves the host here to time DNS on its own, then has urllib3
+        # connect to each resolved address in turn, so there is no second
+        # lookup. A failed lookup is left to urllib3 to report.
+        host = self._dns_host.strip("[]") if self._dns_host.startswith("[") else self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            addresses = []
+        finally:
+            _phases.dns = getattr(_phases, "dns", 0.0) + time.perf_counter() - start
+        if not addresses:
+            return super()._new_conn()
+        dns_host = self._dns_host
+        try:
+            for position, (*_, sockaddr) in enumerate(addresses):
+                self._dns_host = sockaddr[0]
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError:
+                    # Also covers NewConnectionError; try the next address
+                    if position == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+
+    def connect(self):
+        start = time.perf_counter()
+        dns_before = getattr(_phases, "dns", 0.0)
+        super().connect()
+        # TCP connect plus TLS handshake, without the DNS lookup
+        elapsed = time.perf_counter() - start - (getattr(_phases, "dns", 0.0) - dns_before)
+        _phases.connect = getattr(_phases, "connect", 0.0) + elapsed
+        _phases.new_connection = True
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class PooledSession(requests.Session):
+    # requests.Session with keep-alive connection pools per host, compressed
+    # transfers, default connect/read timeouts and a cap on response size.
+    # Bodies are streamed in so an oversized page is abandoned early, and
+    # every request's DNS/connect/TTFB/transfer times are recorded.
+    def __init__(self, pool_size=10, connect_timeout=5.0, read_timeout=30.0, max_bytes=20 * 1024 * 1024,
+                 keep_timings=1000):
+        super().__init__()
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_bytes = max_bytes
+        self.timings = deque(maxlen=keep_timings)
+        self._timings_lock = threading.Lock()
+        self.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        stream = kwargs.pop("stream", False)
+        _reset_phases()
+        start = time.perf_counter()
+        response = super().request(method, url, *args, stream=True, **kwargs)
+        headers_at = time.perf_counter()
+        if not stream:
+            self._read_body(response)
+        done = time.perf_counter()
+
+        timing = {
+            "url": url,
+            "status": response.status_code,
+            "reused": not _phases.new_connection,
+            "dns": _phases.dns,
+            "connect": _phases.connect,
+            "ttfb": headers_at - start - _phases.dns - _phases.connect,
+            "transfer": done - headers_at,
+            "wire_bytes": response.raw.tell() if not stream else None,
+            "bytes": len(response._content) if not stream and response._content else 0,
+        }
+        with self._timings_lock:
+            self.timings.append(timing)
+        return response
+
+    def _read_body(self, response):
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            response.close()
+            raise ResponseTooLarge(f"{response.url} is {length} bytes, over the {self.max_bytes} byte limit")
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(64 * 1024):
+            size += len(chunk)
+            if size > self.max_bytes:
+                response.close()
+                raise ResponseTooLarge(f"{response.url} exceeded the {self.max_bytes} byte limit")
+            chunks.append(chunk)
+        response._content = b"".join(chunks)
+        response._content_consumed = True
+
+    def timing_summary(self):
+        with self._timings_lock:
+            timings = list(self.timings)
+        if not timings:
+            return "HTTP: no requests"
+        reused = sum(timing["reused"] for timing in timings)
+        phases = " ".join(
+            f"{phase} {statistics.median(timing[phase] for timing in timings) * 1000:.1f}ms"
+            for phase in ("dns", "connect", "ttfb", "transfer"))
+        wire = sum(timing["wire_bytes"] or 0 for timing in timings)
+        decoded = sum(timing["bytes"] for timing in timings)
+        return (f"HTTP: {len(timings)} requests, {reused} on reused connections, median {phases}, "
+                f"{wire / 1024:.0f} KiB on the wire for {decoded / 1024:.0f} KiB")
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def default_session():
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = PooledSession()
+        return _default_session
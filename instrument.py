@@ -0,0 +1,165 @@
+import cProfile
+import io
+import json
+import math
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Python 3.12+ allows one active cProfile profiler per process, so profiled
+# calls take turns
+_CPROFILE_LOCK = threading.Lock()
+
+
+def percentile(values, q):
+    # Nearest-rank percentile of an already sorted list
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+class RunReport:
+    # Per-article, per-stage timings with byte, section and error counts.
+    # Every event is appended to a JSONL file as it happens; summary()
+    # renders p50/p95/p99 per stage at the end of the run.
+    def __init__(self, jsonl_path=None):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._durations = defaultdict(list)
+        self._totals = defaultdict(lambda: defaultdict(int))
+        self._file = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+            self._file = open(jsonl_path, "w", encoding="utf-8")
+
+    def _emit(self, event):
+        if self._file is not None:
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def record(self, stage, pmc_id, seconds, **fields):
+        event = {"ts": round(time.time(), 6), "stage": stage, "pmc_id": pmc_id, "seconds": round(seconds, 6),
+                 **fields}
+        with self._lock:
+            self._durations[stage].append(seconds)
+            for key in ("bytes", "sections"):
+                if isinstance(fields.get(key), int):
+                    self._totals[stage][key] += fields[key]
+            self._emit(event)
+
+    def error(self, stage, pmc_id, error):
+        with self._lock:
+            self._totals[stage]["errors"] += 1
+            self._emit({"ts": round(time.time(), 6), "stage": stage, "pmc_id": pmc_id,
+                        "error": f"{type(error).__name__}: {error}"})
+
+    @contextmanager
+    def timed(self, stage, pmc_id, **fields):
+        # The yielded dict can be filled with extra fields (bytes, sections...)
+        start = time.perf_counter()
+        yield fields
+        self.record(stage, pmc_id, time.perf_counter() - start, **fields)
+
+    def summary(self):
+        lines = [f"{'stage':<10} {'count':>6} {'errors':>6} {'total s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+                 f"{'p99 ms':>8} {'max ms':>8} {'KiB':>8} {'sections':>8}"]
+        with self._lock:
+            stages = list(self._durations) + [stage for stage in self._totals if stage not in self._durations]
+            for stage in stages:
+                durations = sorted(self._durations.get(stage, []))
+                totals = self._totals[stage]
+                lines.append(
+                    f"{stage:<10} {len(durations):>6} {totals['errors']:>6} {sum(durations):>8.2f} "
+                    f"{percentile(durations, 50) * 1000:>8.1f} {percentile(durations, 95) * 1000:>8.1f} "
+                    f"{percentile(durations, 99) * 1000:>8.1f} {(durations[-1] if durations else 0) * 1000:>8.1f} "
+                    f"{totals['bytes'] / 1024:>8.0f} {totals['sections']:>8}")
+        lines.append(f"wall clock {time.time() - self.started:.2f}s")
+        return "\n".join(lines)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class StageProfiler:
+    # Profiles every call of the wrapped stage functions with cProfile or
+    # pyinstrument. Profilers are kept per thread (neither can profile
+    # other threads) and merged when the report is written. Under cProfile
+    # the profiled stages run one call at a time across all workers, so
+    # their wall-clock timings include waiting for the profiler.
+    def __init__(self, stages, backend="cprofile", output_dir="output"):
+        self.stages = set(stages)
+        self.backend = backend
+        self.output_dir = output_dir
+        self._local = threading.local()
+        self._profilers = defaultdict(list)
+        self._lock = threading.Lock()
+        if backend == "pyinstrument":
+            import pyinstrument  # noqa: F401
+        elif backend != "cprofile":
+            raise ValueError(f"Unknown profiler '{backend}', choose from: cprofile, pyinstrument")
+
+    def _profiler(self, stage):
+        profilers = self._local.__dict__.setdefault("profilers", {})
+        if stage not in profilers:
+            if self.backend == "cprofile":
+                profiler = cProfile.Profile()
+            else:
+                from pyinstrument import Profiler
+                profiler = Profiler()
+            profilers[stage] = profiler
+            with self._lock:
+                self._profilers[stage].append(profiler)
+        return profilers[stage]
+
+    def wrap(self, stage, func):
+        if stage not in self.stages:
+            return func
+
+        def profiled(*args, **kwargs):
+            profiler = self._profiler(stage)
+            if self.backend == "cprofile":
+                with _CPROFILE_LOCK:
+                    profiler.enable()
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        profiler.disable()
+            profiler.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.stop()
+        return profiled
+
+    def write(self):
+        # Returns the paths written: <stage>.prof for cProfile (pstats /
+        # snakeviz), <stage>.txt for pyinstrument
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for stage, profilers in self._profilers.items():
+            if self.backend == "cprofile":
+                path = os.path.join(self.output_dir, f"profile-{stage}.prof")
+                stats = pstats.Stats(profilers[0])
+                for profiler in profilers[1:]:
+                    stats.add(profiler)
+                stats.dump_stats(path)
+                text = io.StringIO()
+                pstats.Stats(path, stream=text).sort_stats("cumulative").print_stats(15)
+                print(f"Profile of stage '{stage}':\n{text.getvalue()}")
+            else:
+                from pyinstrument.renderers import ConsoleRenderer
+                from pyinstrument.session import Session
+
+                path = os.path.join(self.output_dir, f"profile-{stage}.txt")
+                session = profilers[0].last_session
+                for profiler in profilers[1:]:
+                    session = Session.combine(session, profiler.last_session)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(ConsoleRenderer().render(session))
+            paths.append(path)
+        return paths
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import threading
+
+
+def input_digest(kind, category, article, abstract, section_data):
+    # Hash of everything an output artifact is rendered from
+    payload = {
+        "kind": kind,
+        "category": category,
+        "title": article.get("title"),
+        "authors": article.get("authors"),
+        "doi": article.get("doi"),
+        "abstract": abstract,
+        "sections": list(section_data.items()),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class BuildManifest:
+    # Records the input digest each artifact was last built from, so a rerun
+    # only regenerates PDFs/MP3s whose inputs changed or whose file is gone
+    def __init__(self, path="output/.manifest.json"):
+        self.path = path
+        self.built = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def is_fresh(self, artifact, digest):
+        fresh = self.entries.get(artifact) == digest and os.path.exists(artifact)
+        if fresh:
+            with self._lock:
+                self.skipped += 1
+        return fresh
+
+    def record(self, artifact, digest):
+        with self._lock:
+            self.entries[artifact] = digest
+            self.built += 1
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def summary(self):
+        return f"Build: {self.built} artifacts generated, {self.skipped} up to date"
@@ -0,0 +1,120 @@
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+from summarizer import SENTENCE_RE
+
+
+@functools.lru_cache(maxsize=None)
+def stylesheet():
+    # Built once per process instead of once per document
+    return getSampleStyleSheet()
+
+
+def split_paragraphs(text, max_chars=2000):
+    # Section text arrives as paragraphs joined by newlines. Each one
+    # becomes its own Paragraph, and paragraphs longer than max_chars are
+    # cut on sentence boundaries so ReportLab never lays out one huge block.
+    for paragraph in text.split("\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph
+            continue
+        current = ""
+        for sentence in SENTENCE_RE.split(paragraph):
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                yield current
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            yield current
+
+
+def article_flowables(category, title, authors, doi, abstract, section_data, styles=None, max_chars=2000):
+    # Text is escaped because Paragraph treats its input as markup
+    if styles is None:
+        styles = stylesheet()
+    content = []
+
+    # Add category and article information to the PDF
+    content.append(Paragraph(f"Category: {escape(category.capitalize())}", styles["Title"]))
+    content.append(Paragraph(f"Title: {escape(title)}", styles["Heading1"]))
+    content.append(Paragraph(f"Authors: {escape(authors)}", styles["Normal"]))
+    content.append(Paragraph(f"DOI: {escape(doi)}", styles["Normal"]))
+
+    # Add abstract content to the PDF
+    if abstract:
+        content.append(Paragraph("Summary:", styles["Normal"]))
+        content.extend(Paragraph(escape(part), styles["Normal"]) for part in split_paragraphs(abstract, max_chars))
+
+    # Add section summaries to the PDF
+    for section_title, section_summary in section_data.items():
+        content.append(Paragraph(escape(section_title), styles["Heading3"]))
+        content.extend(Paragraph(escape(part), styles["Normal"])
+                       for part in split_paragraphs(section_summary, max_chars))
+    return content
+
+
+def write_pdf(filename, flowables):
+    # Builds next to the target and renames into place, so readers never
+    # see a half-written PDF
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    tmp_path = f"{filename}.{os.getpid()}.tmp"
+    try:
+        SimpleDocTemplate(tmp_path, pagesize=letter).build(flowables)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return filename
+
+
+def render_article_pdf(filename, category, title, authors, doi, abstract, section_data):
+    return write_pdf(filename, article_flowables(category, title, authors, doi, abstract, section_data))
+
+
+def render_category_pdf(filename, category, articles):
+    # One document for a whole category in a single build; `articles`
+    # yields (title, authors, doi, abstract, section_data)
+    flowables = []
+    for title, authors, doi, abstract, section_data in articles:
+        if flowables:
+            flowables.append(PageBreak())
+        flowables.extend(article_flowables(category, title, authors, doi, abstract, section_data))
+    return write_pdf(filename, flowables)
+
+
+class PdfRenderPool:
+    # Renders article PDFs in worker processes; ReportLab layout is pure
+    # Python and would otherwise serialize on the GIL
+    def __init__(self, workers=None):
+        self._executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def submit(self, filename, category, title, authors, doi, abstract, section_data):
+        return self._executor.submit(render_article_pdf, filename, category, title, authors, doi, abstract,
+                                     section_data)
+
+    def render(self, *args):
+        return self.submit(*args).result()
+
+    def start(self):
+        # Starts the worker processes now instead of on the first submit
+        self._executor.submit(int).result()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,161 @@
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class Stage:
+    # One pipeline step run by `workers` threads reading from a bounded
+    # queue. func takes an item (or a list of up to `batch` items) and
+    # returns the item(s) to pass downstream; None drops the item.
+    def __init__(self, name, func, workers=1, queue_size=None, batch=1, downstream=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+        self.batch = batch
+        self.downstream = downstream
+        self.queue = None
+        self.outputs = []
+        self.downstream_stages = []
+        self.stats = {"processed": 0, "errors": 0, "busy_seconds": 0.0, "max_depth": 0,
+                      "depth_samples": 0, "depth_total": 0}
+        self._lock = threading.Lock()
+        self._finished_workers = 0
+
+    def _next_batch(self):
+        # Blocks for one item, then takes whatever else is already queued up
+        # to `batch`; returns None once the stage is shut down
+        item = self.queue.get()
+        if item is _DONE:
+            return None
+        items = [item]
+        while len(items) < self.batch:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                # Hand the sentinel back for this worker's next round
+                self.queue.put(item)
+                break
+            items.append(item)
+        return items
+
+    def _emit(self, result):
+        for output in self.outputs:
+            output.put(result)
+
+    def _record_depth(self):
+        depth = self.queue.qsize()
+        with self._lock:
+            self.stats["max_depth"] = max(self.stats["max_depth"], depth)
+            self.stats["depth_samples"] += 1
+            self.stats["depth_total"] += depth
+
+    def _work(self, on_error):
+        while True:
+            self._record_depth()
+            items = self._next_batch()
+            if items is None:
+                break
+            start = time.perf_counter()
+            try:
+                if self.batch == 1:
+                    results = [self.func(items[0])]
+                else:
+                    results = self.func(items)
+            except Exception as e:
+                results = []
+                with self._lock:
+                    self.stats["errors"] += len(items)
+                for item in items:
+                    on_error(self.name, item, e)
+            busy = time.perf_counter() - start
+            with self._lock:
+                self.stats["busy_seconds"] += busy
+                self.stats["processed"] += len(items)
+            for result in results:
+                if result is not None:
+                    self._emit(result)
+
+        with self._lock:
+            self._finished_workers += 1
+            last = self._finished_workers == self.workers
+        if last:
+            for stage in self.downstream_stages:
+                for _ in range(stage.workers):
+                    stage.queue.put(_DONE)
+
+
+class Pipeline:
+    # Stages connected by bounded queues. Each stage feeds the next one in
+    # the list unless it names its own `downstream` stages (an empty list
+    # makes it a sink). A full queue blocks its producers, so the number
+    # of items in flight, and with it memory, stays bounded however many
+    # items go in.
+    def __init__(self, stages, queue_size=8, on_error=None):
+        self.stages = stages
+        self.on_error = on_error or (lambda stage, item, error: None)
+        by_name = {stage.name: stage for stage in stages}
+        for stage in stages:
+            stage.queue = queue.Queue(maxsize=stage.queue_size or queue_size)
+        for index, stage in enumerate(stages):
+            if stage.downstream is None:
+                names = [stages[index + 1].name] if index + 1 < len(stages) else []
+            else:
+                names = stage.downstream
+            stage.downstream_stages = [by_name[name] for name in names]
+            stage.outputs = [downstream.queue for downstream in stage.downstream_stages]
+        self.started = None
+        self.finished = None
+
+    def run(self, items):
+        self.started = time.perf_counter()
+        threads = [
+            threading.Thread(target=stage._work, args=(self.on_error,), name=f"{stage.name}-{number}",
+                             daemon=True)
+            for stage in self.stages
+            for number in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        first = self.stages[0]
+        for item in items:
+            first.queue.put(item)
+        for _ in range(first.workers):
+            first.queue.put(_DONE)
+
+        for thread in threads:
+            thread.join()
+        self.finished = time.perf_counter()
+
+    def report(self):
+        # Per-stage throughput, queue depth and utilization (busy time over
+        # worker time); the stage closest to 100% is the bottleneck
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        rows = []
+        for stage in self.stages:
+            stats = stage.stats
+            rows.append({
+                "stage": stage.name,
+                "workers": stage.workers,
+                "processed": stats["processed"],
+                "errors": stats["errors"],
+                "queue_depth": stage.queue.qsize(),
+                "max_depth": stats["max_depth"],
+                "mean_depth": stats["depth_total"] / stats["depth_samples"] if stats["depth_samples"] else 0.0,
+                "utilization": stats["busy_seconds"] / (stage.workers * elapsed) if elapsed else 0.0,
+            })
+        return rows
+
+    def summary(self):
+        lines = [f"{'stage':<10} {'workers':>7} {'items':>6} {'errors':>6} {'depth':>5} {'max':>4} "
+                 f"{'mean':>5} {'busy':>5}"]
+        for row in self.report():
+            lines.append(f"{row['stage']:<10} {row['workers']:>7} {row['processed']:>6} {row['errors']:>6} "
+                         f"{row['queue_depth']:>5} {row['max_depth']:>4} {row['mean_depth']:>5.1f} "
+                         f"{row['utilization']:>5.0%}")
+        return "\n".join(lines)
@@ -0,0 +1,124 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from sections import DEFAULT_CLASSIFIER
+
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+# Only the abstract and section containers are ever read from a page. A
+# regex is used because list matching misses multi-class nodes such as
+# class="tsec sec" on recent BeautifulSoup releases.
+ARTICLE_NODES = SoupStrainer(class_=re.compile(r"(?:^|\s)(?:abstract-content|tsec)(?:\s|$)"))
+
+
+def available_backends():
+    backends = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+    try:
+        _selectolax_parser()
+        backends.append("selectolax")
+    except ImportError:
+        pass
+    return backends
+
+
+def _selectolax_parser():
+    # selectolax 1.0 replaced the Modest backend with Lexbor
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        return LexborHTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+        return HTMLParser
+
+
+def parse_sections_content(content, backend="html.parser", streaming=False, classifier=DEFAULT_CLASSIFIER,
+                           category=None):
+    # `streaming` builds only the .abstract-content and .tsec subtrees
+    # instead of the whole page; the result is the same either way. Sections
+    # the classifier rejects for `category` are dropped before their text is
+    # extracted.
+    if backend == "selectolax":
+        return _parse_selectolax(content, classifier, category)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}', choose from: {', '.join(BACKENDS)}")
+
+    soup = BeautifulSoup(content, backend, parse_only=ARTICLE_NODES if streaming else None)
+
+    abstract_section = soup.select_one(".abstract-content")
+    if abstract_section:
+        abstract = abstract_section.get_text().strip()
+    else:
+        abstract = ""
+
+    sections = soup.select(".tsec")
+    section_data = {}
+
+    for section in sections:
+        section_title_element = section.find("h1") or section.find("h2") or section.find("h3") or section.find(
+            "h4")
+        if section_title_element:
+            section_title = section_title_element.get_text().strip()
+
+            if not classifier.is_unwanted(section_title, category):
+                section_data[section_title] = "\n".join([p.get_text() for p in section.select("p")])
+
+    return abstract, section_data
+
+
+def _parse_selectolax(content, classifier, category):
+    tree = _selectolax_parser()(content)
+
+    abstract_section = tree.css_first(".abstract-content")
+    abstract = abstract_section.text().strip() if abstract_section else ""
+
+    section_data = {}
+    for section in tree.css(".tsec"):
+        section_title_element = (section.css_first("h1") or section.css_first("h2")
+                                 or section.css_first("h3") or section.css_first("h4"))
+        if section_title_element:
+            section_title = section_title_element.text().strip()
+
+            if not classifier.is_unwanted(section_title, category):
+                section_data[section_title] = "\n".join([p.text() for p in section.css("p")])
+
+    return abstract, section_data
+
+
+class ParsePool:
+    # Runs parse_sections_content in worker processes so HTML parsing does
+    # not hold the GIL of the fetching threads
+    def __init__(self, workers=None, backend="html.parser", streaming=True):
+        if backend not in available_backends():
+            raise ValueError(f"Parser backend '{backend}' is not available, choose from: "
+                             f"{', '.join(available_backends())}")
+        self.backend = backend
+        self.streaming = streaming
+        self._executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def submit(self, content, classifier=DEFAULT_CLASSIFIER, category=None):
+        return self._executor.submit(parse_sections_content, content, self.backend, self.streaming, classifier,
+                                     category)
+
+    def parse(self, content, classifier=DEFAULT_CLASSIFIER, category=None):
+        return self.submit(content, classifier, category).result()
+
+    def start(self):
+        # Starts the worker processes now instead of on the first submit
+        self._executor.submit(int).result()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,181 @@
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    # Token bucket whose rate adapts to the upstream: it halves on every
+    # throttled response and creeps back up to the configured rate on success
+    def __init__(self, rate, capacity=None, min_rate=0.1):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        # Blocks until a token is available; returns the seconds spent waiting
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self._paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        # Holds every caller of this bucket back, e.g. for a Retry-After
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=5, base_delay=0.5, max_delay=60.0, statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = statuses
+
+    def delay(self, attempt, response=None):
+        # Honors Retry-After (seconds or an HTTP date), otherwise exponential
+        # backoff with full jitter
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_delay, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    when = email.utils.parsedate_to_datetime(retry_after).timestamp()
+                    return min(self.max_delay, max(0.0, when - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class RateLimiter:
+    # Per-host token buckets and concurrency caps with retry scheduling.
+    # Time spent waiting on buckets or backoff is counted as throttled,
+    # time spent in the wrapped call as working.
+    def __init__(self, rate=3, per_host=4, policy=None, rates=None):
+        self.rate = rate
+        self.per_host = per_host
+        self.rates = rates or {}
+        self.policy = policy if policy is not None else RetryPolicy()
+        self.metrics = {"requests": 0, "retries": 0, "throttled_seconds": 0.0, "working_seconds": 0.0}
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._semaphores = {}
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+                rate = self.rates.get(host, self.rate)
+                self._buckets[host] = TokenBucket(rate) if rate else None
+            return self._buckets[host], self._semaphores[host]
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.metrics[key] += value
+
+    def call(self, host, func, *args, retry_on=(), **kwargs):
+        # Calls func under the host's limits. Responses with a retryable
+        # status and exceptions in `retry_on` are retried with backoff; the
+        # last response is returned and the last exception re-raised.
+        bucket, semaphore = self._host(host)
+        attempt = 0
+        while True:
+            with semaphore:
+                if bucket is not None:
+                    self._count("throttled_seconds", bucket.acquire())
+                start = time.monotonic()
+                try:
+                    result, error = func(*args, **kwargs), None
+                except retry_on as e:
+                    result, error = None, e
+                finally:
+                    self._count("working_seconds", time.monotonic() - start)
+                    self._count("requests")
+
+            # requests and gTTS attach the failed response as .response / .rsp;
+            # Response objects are falsy for error statuses, hence no `or`
+            response = result
+            if error is not None:
+                response = getattr(error, "response", None)
+                if response is None:
+                    response = getattr(error, "rsp", None)
+            status = getattr(response, "status_code", None)
+            if error is None and status not in self.policy.statuses:
+                if bucket is not None:
+                    bucket.succeeded()
+                return result
+
+            attempt += 1
+            if attempt >= self.policy.max_attempts:
+                if error is not None:
+                    raise error
+                return result
+
+            delay = self.policy.delay(attempt, response)
+            if bucket is not None:
+                if status == 429:
+                    bucket.throttled()
+                bucket.pause(delay)
+            else:
+                time.sleep(delay)
+                self._count("throttled_seconds", delay)
+            self._count("retries")
+
+    def request(self, url, func, *args, **kwargs):
+        return self.call(urlsplit(url).netloc, func, url, *args, **kwargs)
+
+    def summary(self):
+        metrics = self.metrics
+        return (f"Rate limiter: {metrics['requests']} requests, {metrics['retries']} retries, "
+                f"{metrics['throttled_seconds']:.1f}s throttled, {metrics['working_seconds']:.1f}s working")
+
+
+class FailedQueue:
+    # Articles that still failed after all retries, kept for a later pass
+    def __init__(self):
+        self._items = []
+        self._lock = threading.Lock()
+
+    def add(self, article, error):
+        with self._lock:
+            self._items.append((article, error))
+
+    def drain(self):
+        with self._lock:
+            items, self._items = self._items, []
+        return items
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,134 @@
+import bisect
+import csv
+import json
+import os
+import re
+import sqlite3
+from collections import defaultdict
+
+ARTICLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "articles")
+
+FIELDS = ("pmc_id", "title", "authors", "doi", "year", "category")
+
+
+def parse_year(value):
+    # Registry years look like "2021", "2019 Apr 11" or "2022 Apr-Jun"
+    match = re.match(r"\s*(\d{4})", str(value or ""))
+    return int(match.group(1)) if match else None
+
+
+class ArticleRegistry:
+    # Articles keyed by PMC ID, with secondary indexes on year, DOI and
+    # category. Duplicate PMC IDs are dropped on load (first one wins).
+    def __init__(self, articles=()):
+        self._articles = {}
+        # Insertion ordinals, so filter() can return registry order without a scan
+        self._order = {}
+        self._by_category = defaultdict(list)
+        self._by_year = defaultdict(list)
+        self._years = []
+        self._by_doi = {}
+        self.duplicates = 0
+        for article in articles:
+            self.add(article)
+
+    def add(self, article):
+        pmc_id = article["pmc_id"].strip()
+        if pmc_id in self._articles:
+            self.duplicates += 1
+            return False
+        article = {**article, "pmc_id": pmc_id}
+        self._articles[pmc_id] = article
+        self._order[pmc_id] = len(self._order)
+
+        self._by_category[article.get("category") or ""].append(pmc_id)
+        year = parse_year(article.get("year"))
+        if year is not None:
+            if year not in self._by_year:
+                bisect.insort(self._years, year)
+            self._by_year[year].append(pmc_id)
+        if article.get("doi"):
+            self._by_doi[article["doi"].lower()] = pmc_id
+        return True
+
+    def __len__(self):
+        return len(self._articles)
+
+    def __iter__(self):
+        return iter(self._articles.values())
+
+    def __contains__(self, pmc_id):
+        return pmc_id in self._articles
+
+    def get(self, pmc_id):
+        return self._articles.get(pmc_id)
+
+    def by_doi(self, doi):
+        pmc_id = self._by_doi.get(doi.lower())
+        return self._articles[pmc_id] if pmc_id else None
+
+    def categories(self):
+        return sorted(category for category in self._by_category if category)
+
+    def filter(self, category=None, year_min=None, year_max=None, pmc_ids=None):
+        # Narrows the candidate set through the indexes, then returns the
+        # matching articles in registry order
+        if category is not None and year_min is None and year_max is None and pmc_ids is None:
+            # The category index is already in registry order
+            return [self._articles[pmc_id] for pmc_id in self._by_category.get(category, ())]
+        candidates = None
+        if category is not None:
+            candidates = set(self._by_category.get(category, ()))
+        if year_min is not None or year_max is not None:
+            lo = bisect.bisect_left(self._years, year_min) if year_min is not None else 0
+            hi = bisect.bisect_right(self._years, year_max) if year_max is not None else len(self._years)
+            in_years = {pmc_id for year in self._years[lo:hi] for pmc_id in self._by_year[year]}
+            candidates = in_years if candidates is None else candidates & in_years
+        if pmc_ids is not None:
+            pmc_ids = {pmc_id for pmc_id in pmc_ids if pmc_id in self._order}
+            candidates = pmc_ids if candidates is None else candidates & pmc_ids
+        if candidates is None:
+            return list(self._articles.values())
+        return [self._articles[pmc_id] for pmc_id in sorted(candidates, key=self._order.__getitem__)]
+
+    def load(self, path, category=None):
+        # Loads a .jsonl, .csv or SQLite (.db/.sqlite, table "articles") file.
+        # Records without a category take the one given, or the file name.
+        category = category or os.path.splitext(os.path.basename(path))[0]
+        for article in _read_records(path):
+            if not article.get("pmc_id"):
+                continue
+            article.setdefault("category", category)
+            article["category"] = article["category"] or category
+            self.add(article)
+        return self
+
+    @classmethod
+    def from_dir(cls, path=ARTICLES_DIR):
+        registry = cls()
+        for name in sorted(os.listdir(path)):
+            if os.path.splitext(name)[1] in (".jsonl", ".csv", ".db", ".sqlite"):
+                registry.load(os.path.join(path, name))
+        return registry
+
+
+def _read_records(path):
+    extension = os.path.splitext(path)[1]
+    if extension == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif extension == ".csv":
+        with open(path, encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+    elif extension in (".db", ".sqlite"):
+        db = sqlite3.connect(path)
+        db.row_factory = sqlite3.Row
+        try:
+            for row in db.execute("SELECT * FROM articles"):
+                yield {key: row[key] for key in row.keys() if key in FIELDS}
+        finally:
+            db.close()
+    else:
+        raise ValueError(f"Unsupported article registry format: {path}")
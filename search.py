@@ -0,0 +1,180 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from cache import CACHE_DIR
+from corpus import article_digest
+from registry import parse_year
+
+# bm25 column weights: section title, section text, authors
+WEIGHTS = (5.0, 1.0, 2.0)
+
+
+class SearchIndex:
+    # SQLite FTS5 index with one document per section (the abstract counts
+    # as a section titled "Abstract"). Section titles, text and authors are
+    # searchable; PMC ID, article title, category and year ride along
+    # unindexed for display and filtering. Articles are added as they are
+    # parsed and skipped when their filtered content has not changed; results
+    # are ranked with bm25.
+    def __init__(self, path=os.path.join(CACHE_DIR, "search.sqlite")):
+        self.stats = {"indexed": 0, "unchanged": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                pmc_id TEXT PRIMARY KEY,
+                digest TEXT
+            );
+            -- FTS5 rowids per article; pmc_id is UNINDEXED in the FTS table,
+            -- so deleting by it would scan the whole index
+            CREATE TABLE IF NOT EXISTS document_rows (
+                pmc_id TEXT NOT NULL,
+                row INTEGER NOT NULL,
+                PRIMARY KEY (pmc_id, row)
+            ) WITHOUT ROWID;
+            CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(
+                section_title, content, authors,
+                pmc_id UNINDEXED, title UNINDEXED, category UNINDEXED, year UNINDEXED,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+        """)
+
+    def add(self, article, abstract, section_data):
+        # Replaces the article's sections; returns False when already indexed
+        # with the same content
+        pmc_id = article["pmc_id"]
+        digest = article_digest(article, abstract, section_data)
+        sections = {"Abstract": abstract, **section_data} if abstract else section_data
+        rows = [(title, content, article.get("authors") or "", pmc_id, article.get("title"),
+                 article.get("category"), parse_year(article.get("year")))
+                for title, content in sections.items()]
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM documents WHERE pmc_id = ?", (pmc_id,)).fetchone()
+            if row is not None and row[0] == digest:
+                self.stats["unchanged"] += 1
+                return False
+            if row is not None:
+                self._delete(pmc_id)
+            rowids = [self._db.execute("INSERT INTO sections VALUES (?, ?, ?, ?, ?, ?, ?)", values).lastrowid
+                      for values in rows]
+            self._db.executemany("INSERT INTO document_rows VALUES (?, ?)", [(pmc_id, rowid) for rowid in rowids])
+            self._db.execute("INSERT OR REPLACE INTO documents VALUES (?, ?)", (pmc_id, digest))
+            self._db.commit()
+            self.stats["indexed"] += 1
+        return True
+
+    def _delete(self, pmc_id):
+        # Called with the lock held
+        rowids = self._db.execute("SELECT row FROM document_rows WHERE pmc_id = ?", (pmc_id,)).fetchall()
+        if rowids:
+            self._db.executemany("DELETE FROM sections WHERE rowid = ?", rowids)
+            self._db.execute("DELETE FROM document_rows WHERE pmc_id = ?", (pmc_id,))
+        else:
+            # Indexed before rowids were recorded
+            self._db.execute("DELETE FROM sections WHERE pmc_id = ?", (pmc_id,))
+
+    def search(self, query, limit=10, category=None, year_min=None, year_max=None):
+        # `query` is FTS5 syntax ("cardiac arrest", spinal NEAR/5 infant,
+        # authors:shorten); anything FTS5 cannot parse is searched as plain words
+        try:
+            return self._search(query, limit, category, year_min, year_max)
+        except sqlite3.OperationalError:
+            words = " ".join('"{}"'.format(word.replace('"', '""')) for word in query.split())
+            return self._search(words, limit, category, year_min, year_max) if words else []
+
+    def _search(self, query, limit, category, year_min, year_max):
+        clauses, params = ["sections MATCH ?"], [query]
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if year_min is not None:
+            clauses.append("year >= ?")
+            params.append(year_min)
+        if year_max is not None:
+            clauses.append("year <= ?")
+            params.append(year_max)
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT pmc_id, title, section_title, year, category, "
+                "snippet(sections, 1, '[', ']', '...', 16), bm25(sections, ?, ?, ?) AS score "
+                f"FROM sections WHERE {' AND '.join(clauses)} ORDER BY score LIMIT ?",
+                (*WEIGHTS, *params)).fetchall()
+        return [{"pmc_id": pmc_id, "title": title, "section_title": section_title, "year": year,
+                 "category": category, "snippet": snippet, "score": -score}
+                for pmc_id, title, section_title, year, category, snippet, score in rows]
+
+    def rebuild(self, corpus):
+        # Reindexes everything in a CorpusStore
+        with self._lock:
+            self._db.execute("DELETE FROM sections")
+            self._db.execute("DELETE FROM documents")
+            self._db.execute("DELETE FROM document_rows")
+            self._db.commit()
+        for article, abstract, section_data in corpus.iter_articles():
+            self.add(article, abstract, section_data)
+        self.optimize()
+
+    def optimize(self):
+        # Merges all FTS5 segments into one; rewrites the whole index
+        with self._lock:
+            self._db.execute("INSERT INTO sections(sections) VALUES ('optimize')")
+            self._db.commit()
+
+    def merge(self, pages=1000):
+        # Incremental merge of the segments written by recent adds, bounded to
+        # about `pages` pages of work
+        with self._lock:
+            self._db.execute("INSERT INTO sections(sections, rank) VALUES ('merge', ?)", (pages,))
+            self._db.commit()
+
+    def summary(self):
+        with self._lock:
+            articles, sections = self._db.execute(
+                "SELECT (SELECT COUNT(*) FROM documents), (SELECT COUNT(*) FROM sections)").fetchone()
+        return (f"Search index: {articles} articles, {sections} sections, "
+                f"{self.stats['indexed']} indexed, {self.stats['unchanged']} unchanged")
+
+    def close(self):
+        self._db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search fetched PMC article sections")
+    parser.add_argument("query", nargs="?", help="FTS5 query, e.g. '\"cardiac arrest\" AND infant'")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--category")
+    parser.add_argument("--year-min", type=int)
+    parser.add_argument("--year-max", type=int)
+    parser.add_argument("--index", default=os.path.join(CACHE_DIR, "search.sqlite"))
+    parser.add_argument("--rebuild", action="store_true", help="reindex the corpus store first")
+    args = parser.parse_args(argv)
+    if not args.query and not args.rebuild:
+        parser.error("a query or --rebuild is required")
+
+    index = SearchIndex(args.index)
+    if args.rebuild:
+        from corpus import CorpusStore
+
+        index.rebuild(CorpusStore())
+        print(index.summary())
+    if args.query:
+        start = time.perf_counter()
+        results = index.search(args.query, limit=args.limit, category=args.category, year_min=args.year_min,
+                               year_max=args.year_max)
+        elapsed = time.perf_counter() - start
+        for result in results:
+            print(f"\033[1m{result['title']}\033[0m ({result['pmc_id']}, {result['year']})")
+            snippet = " ".join(result["snippet"].split())
+            print(f"  {result['section_title']}: {snippet}  [{result['score']:.2f}]")
+        print(f"{len(results)} results in {elapsed * 1000:.1f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
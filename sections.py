@@ -0,0 +1,194 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+from cache import CACHE_DIR
+
+# Exact titles that are never summarized (matched after normalization)
+UNWANTED_SECTIONS = [
+    "Abstract",
+    "Supplementary information",
+    "Associated Data",
+    "Acknowledgments",
+    "Abbreviations",
+    "Authors’ contributions",
+    "Funding",
+    "Availability of data and materials",
+    "Ethics approval and consent to participate",
+    "Consent for publication",
+    "Competing interests",
+    "Footnotes",
+    "Publisher’s Note",
+    "References",
+    "Appendix. SUPPLEMENTARY INFORMATION",
+    "REFERENCES",
+    "Disclosure",
+    "Appendix. Authors",
+    "Study Funding",
+]
+
+# Back-matter title variants, matched against the whole normalized title
+UNWANTED_PATTERNS = [
+    r"acknowledge?ments?",
+    r"(study |research )?funding( sources?| information| statement)?",
+    r"sources? of funding",
+    r"financial (support|disclosures?)",
+    r"(conflicts?|declarations?) of (competing )?interests?( statements?| disclosures?)?",
+    r"(competing|financial) interests?( statements?)?",
+    r"disclosures?",
+    r"declarations?",
+    r"authors? contributions?",
+    r"(author|contributor) information",
+    r"contributors?",
+    r"references?( cited)?",
+    r"bibliography",
+    r"footnotes?",
+    r"supplementary (information|materials?|data|files?)",
+    r"supporting information",
+    r"associated data",
+    r"abbreviations?( used)?",
+    r"ethics (approval|statement|declarations?)( and consent to participate)?",
+    r"ethical (approval|considerations|statement)",
+    r"consent for publication",
+    r"(data|code) (availability|sharing)( statement)?",
+    r"availability of (data|data and materials|supporting data)",
+    r"publishers? note",
+    r"appendix (authors|supplementary information)",
+]
+
+_QUOTES = str.maketrans({"’": "", "‘": "", "'": "", "`": ""})
+_NUMBERING = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[ivxlc]+[.)])\s+")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize_title(title):
+    # "2. Authors’ Contributions:" -> "authors contributions"
+    title = unicodedata.normalize("NFKC", title).casefold().strip()
+    title = _NUMBERING.sub("", title).translate(_QUOTES)
+    return _NON_WORD.sub(" ", title).strip()
+
+
+def _compile(patterns):
+    patterns = list(patterns)
+    return re.compile("(?:" + "|".join(patterns) + ")") if patterns else None
+
+
+class SectionClassifier:
+    # Decides which sections are boilerplate by title. Titles are
+    # normalized (case, punctuation, numbering, curly quotes), looked up in
+    # a set of exact titles and then matched against one compiled
+    # alternation of patterns. Per-category rules add `exclude` patterns or
+    # `keep` patterns that override the defaults for that category.
+    def __init__(self, exact=UNWANTED_SECTIONS, patterns=UNWANTED_PATTERNS, category_rules=None):
+        self._exact = frozenset(normalize_title(title) for title in exact)
+        self._pattern = _compile(patterns)
+        self._categories = {
+            category: (_compile(rules.get("exclude", ())), _compile(rules.get("keep", ())))
+            for category, rules in (category_rules or {}).items()
+        }
+        self._rules = json.dumps([sorted(self._exact), list(patterns), category_rules or {}], sort_keys=True)
+        self._decisions = {}
+
+    def __getstate__(self):
+        # Sent to parser processes with every page; the memo stays behind
+        return {**self.__dict__, "_decisions": {}}
+
+    def cache_key(self, category=None):
+        # Identifies the rules applied to `category`, for caching parse results
+        rules = self._rules + (category if category in self._categories else "")
+        return hashlib.sha1(rules.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_file(cls, path):
+        # {"exclude": [...], "categories": {"cardiology": {"exclude": [...], "keep": [...]}}};
+        # top-level excludes are added to the built-in patterns
+        with open(path, encoding="utf-8") as f:
+            rules = json.load(f)
+        return cls(patterns=UNWANTED_PATTERNS + list(rules.get("exclude", ())),
+                   category_rules=rules.get("categories"))
+
+    def is_unwanted(self, title, category=None):
+        key = (title, category)
+        decision = self._decisions.get(key)
+        if decision is None:
+            decision = self._decisions[key] = self._classify(normalize_title(title), category)
+        return decision
+
+    def _classify(self, title, category):
+        exclude, keep = self._categories.get(category, (None, None))
+        if keep is not None and keep.fullmatch(title):
+            return False
+        if title in self._exact:
+            return True
+        if self._pattern is not None and self._pattern.fullmatch(title):
+            return True
+        return exclude is not None and exclude.fullmatch(title) is not None
+
+    def filter(self, section_data, category=None):
+        return {title: content for title, content in section_data.items()
+                if not self.is_unwanted(title, category)}
+
+
+DEFAULT_CLASSIFIER = SectionClassifier()
+
+
+def _content_digest(content):
+    return hashlib.sha1(" ".join(content.casefold().split()).encode("utf-8")).hexdigest()
+
+
+class BoilerplateDetector:
+    # Learns sections whose text repeats verbatim (up to case and
+    # whitespace) across articles: journal disclaimers, standard funding
+    # statements and the like. Each section's digest is recorded with the
+    # PMC ID it came from, and once the same text has been seen in
+    # `min_articles` different articles it is dropped from every article
+    # after that. Counts persist across runs.
+    def __init__(self, path=os.path.join(CACHE_DIR, "boilerplate.sqlite"), min_articles=5):
+        self.min_articles = min_articles
+        self.stats = {"sections": 0, "boilerplate": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS occurrences (
+                digest TEXT NOT NULL,
+                pmc_id TEXT NOT NULL,
+                title TEXT NOT NULL,
+                PRIMARY KEY (digest, pmc_id)
+            ) WITHOUT ROWID;
+        """)
+
+    def filter(self, pmc_id, section_data):
+        if self.min_articles <= 0:
+            return section_data
+        digests = {title: _content_digest(content) for title, content in section_data.items()}
+        with self._lock:
+            self._db.executemany("INSERT OR IGNORE INTO occurrences VALUES (?, ?, ?)",
+                                 [(digest, pmc_id, normalize_title(title)) for title, digest in digests.items()])
+            self._db.commit()
+            repeated = {digest for digest in set(digests.values())
+                        if self._db.execute("SELECT COUNT(*) FROM occurrences WHERE digest = ?",
+                                            (digest,)).fetchone()[0] >= self.min_articles}
+            self.stats["sections"] += len(section_data)
+            self.stats["boilerplate"] += sum(1 for digest in digests.values() if digest in repeated)
+        return {title: content for title, content in section_data.items() if digests[title] not in repeated}
+
+    def common(self, limit=20):
+        # The most repeated section texts as (title, articles)
+        with self._lock:
+            return self._db.execute(
+                "SELECT MIN(title), COUNT(*) AS articles FROM occurrences GROUP BY digest "
+                "HAVING articles >= ? ORDER BY articles DESC LIMIT ?", (self.min_articles, limit)).fetchall()
+
+    def summary(self):
+        return (f"Boilerplate: {self.stats['boilerplate']} of {self.stats['sections']} sections dropped "
+                f"as repeated text")
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+import re
+import signal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import requests
+
+from anaesthology import BatchResources, audio_path, parse_article, pdf_path, render_audio, render_pdf
+from audio import AudioSynthesizer, get_tts_backend
+from fetcher import fetch_article
+from manifest import input_digest
+from pdf_renderer import PdfRenderPool
+from pmc_parser import ParsePool
+from summarizer import get_summarizer
+
+ROUTE = re.compile(r"^/articles/(?P<pmc_id>PMC\d+)/(?P<kind>summary|pdf|audio)$")
+CONTENT_TYPES = {"summary": "application/json", "pdf": "application/pdf", "audio": "audio/mpeg"}
+MAX_HEADERS = 100
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+class SummaryService:
+    # Serves summaries, PDFs and audio for single articles on demand.
+    #
+    # Requests are handled on the event loop; fetching, parsing,
+    # summarizing and rendering run on a pool of generation threads (parsing
+    # and PDF layout go on to the same process pools as batch runs). Parsed
+    # articles come from the corpus store when present and summaries from
+    # the summary cache, and recent summary responses are kept in memory,
+    # so warm requests never touch the network. Corpus lookups and manifest
+    # checks run on a separate small pool of I/O threads and files go out
+    # with sendfile, so cached responses never wait behind generation jobs.
+    # Concurrent requests for the same article share one in-flight job per
+    # step instead of each starting their own.
+    def __init__(self, resources=None, workers=4, parse_workers=None, pdf_processes=None, cache_size=1024,
+                 io_workers=4):
+        self.resources = resources if resources is not None else BatchResources()
+        self.cache_size = cache_size
+        self.stats = {"requests": 0, "warm": 0, "coalesced": 0, "errors": 0}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self._io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="service-io")
+        self._parse_pool = ParsePool(parse_workers)
+        self._pdf_pool = PdfRenderPool(pdf_processes) if pdf_processes != 0 else None
+        # Fork the worker processes before serve() binds the port, so they
+        # inherit neither the listening socket nor client connections
+        self._parse_pool.start()
+        if self._pdf_pool is not None:
+            self._pdf_pool.start()
+        self._inflight = {}
+        self._summaries = OrderedDict()
+
+    def article(self, pmc_id):
+        # Articles outside the registry can still be summarized on demand
+        article = self.resources.registry.get(pmc_id)
+        if article is None:
+            article = {"pmc_id": pmc_id, "title": pmc_id, "authors": "", "doi": "", "year": None,
+                       "category": "uncategorized"}
+        return article
+
+    async def _once(self, key, func, *args):
+        # Runs func(*args) on the worker pool; callers asking for the same
+        # key while it runs wait for that run
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A client that disconnects must not cancel the job for the others
+        return await asyncio.shield(future)
+
+    def _load(self, article):
+        resources = self.resources
+        content = fetch_article(article["pmc_id"], limiter=resources.limiter, cache=resources.cache,
+                                session=resources.session)
+        abstract, section_data = parse_article(resources, article, content, self._parse_pool.parse)
+        if not section_data:
+            raise HTTPError(404, f"No sections found for {article['pmc_id']}")
+        return abstract, section_data
+
+    def _summarize(self, article, abstract, section_data):
+        summaries = self.resources.summarizer.summarize_many([abstract, *section_data.values()])
+        return json.dumps({
+            "pmc_id": article["pmc_id"],
+            "title": article["title"],
+            "authors": article["authors"],
+            "summary": summaries[0],
+            "sections": [{"title": title, "summary": summary}
+                         for title, summary in zip(section_data, summaries[1:])],
+        }, ensure_ascii=False).encode("utf-8")
+
+    def _artifact(self, kind, article, abstract, section_data):
+        # (path, input digest, generator) of a PDF or audio file
+        if kind == "pdf":
+            path = pdf_path(article["category"], article["title"])
+            digest_kind, generate = "pdf", functools.partial(render_pdf, pool=self._pdf_pool)
+        else:
+            path = audio_path(article["category"], article["title"])
+            digest_kind, generate = f"audio-{self.resources.tts.backend.name}", render_audio
+        return path, input_digest(digest_kind, article["category"], article, abstract, section_data), generate
+
+    def _cached(self, kind, article, abstract, section_data):
+        # Same manifest check as batch runs; the path when the file is up to date
+        path, digest, _ = self._artifact(kind, article, abstract, section_data)
+        return path if self.resources.manifest.is_fresh(path, digest) else None
+
+    def _render(self, kind, article, abstract, section_data):
+        resources = self.resources
+        path, digest, generate = self._artifact(kind, article, abstract, section_data)
+        # Another request may have rendered it while this one waited
+        if not resources.manifest.is_fresh(path, digest):
+            generate(resources, article, abstract, section_data)
+            resources.manifest.record(path, digest)
+            resources.manifest.save()
+        return path
+
+    async def get(self, kind, pmc_id):
+        # Returns the response body (summary) or the file path (pdf, audio)
+        if kind == "summary" and pmc_id in self._summaries:
+            self.stats["warm"] += 1
+            self._summaries.move_to_end(pmc_id)
+            return self._summaries[pmc_id]
+        loop = asyncio.get_running_loop()
+        article = self.article(pmc_id)
+        stored = await loop.run_in_executor(self._io, self.resources.corpus.get, pmc_id)
+        if stored is not None and stored[1]:
+            abstract, section_data = stored
+        else:
+            abstract, section_data = await self._once(("article", pmc_id), self._load, article)
+        if kind != "summary":
+            path = await loop.run_in_executor(self._io, self._cached, kind, article, abstract, section_data)
+            if path is not None:
+                self.stats["warm"] += 1
+                return path
+            return await self._once((kind, pmc_id), self._render, kind, article, abstract, section_data)
+        body = await self._once(("summary", pmc_id), self._summarize, article, abstract, section_data)
+        self._summaries[pmc_id] = body
+        if len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last=False)
+        return body
+
+    async def handle(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive: GET and HEAD only, no request bodies
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADERS):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send_error(writer, HTTPError(400), keep_alive=False)
+                    break
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                await self.dispatch(writer, method, target.split("?", 1)[0], keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, writer, method, path, keep_alive):
+        self.stats["requests"] += 1
+        head = method == "HEAD"
+        try:
+            if method not in ("GET", "HEAD"):
+                raise HTTPError(405)
+            if path == "/healthz":
+                body = json.dumps({**self.stats, "inflight": len(self._inflight)}).encode("utf-8")
+                return await self._send(writer, 200, "application/json", body, head=head, keep_alive=keep_alive)
+            match = ROUTE.match(path)
+            if match is None:
+                raise HTTPError(404)
+            kind = match["kind"]
+            result = await self.get(kind, match["pmc_id"])
+        except HTTPError as e:
+            return await self._send_error(writer, e, keep_alive, head=head)
+        except requests.exceptions.HTTPError as e:
+            status = 404 if e.response is not None and e.response.status_code == 404 else 502
+            return await self._send_error(writer, HTTPError(status, str(e)), keep_alive, head=head)
+        except requests.exceptions.RequestException as e:
+            return await self._send_error(writer, HTTPError(502, str(e)), keep_alive, head=head)
+        except Exception as e:
+            print(f"Error occurred: {path}: {e!r}")
+            return await self._send_error(writer, HTTPError(500), keep_alive, head=head)
+        if kind == "summary":
+            return await self._send(writer, 200, CONTENT_TYPES[kind], result, head=head, keep_alive=keep_alive)
+        return await self._send_file(writer, CONTENT_TYPES[kind], result, head=head, keep_alive=keep_alive)
+
+    @staticmethod
+    def _head(status, content_type, length, keep_alive):
+        return (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {length}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer, status, content_type, body, head=False, keep_alive=True):
+        writer.write(self._head(status, content_type, len(body), keep_alive))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+    async def _send_error(self, writer, error, keep_alive, head=False):
+        self.stats["errors"] += 1
+        body = json.dumps({"error": str(error)}).encode("utf-8")
+        await self._send(writer, error.status, "application/json", body, head=head, keep_alive=keep_alive)
+
+    async def _send_file(self, writer, content_type, path, head=False, keep_alive=True):
+        # sendfile(2) where the transport supports it; otherwise asyncio copies
+        # the file on its default executor, never on the generation threads
+        with open(path, "rb") as f:
+            writer.write(self._head(200, content_type, os.fstat(f.fileno()).st_size, keep_alive))
+            await writer.drain()
+            if not head:
+                await asyncio.get_running_loop().sendfile(writer.transport, f)
+
+    def close(self):
+        self._executor.shutdown()
+        self._io.shutdown()
+        self._parse_pool.close()
+        if self._pdf_pool is not None:
+            self._pdf_pool.close()
+        self.resources.manifest.save()
+
+
+async def serve(service, host="0.0.0.0", port=8000):
+    server = await asyncio.start_server(service.handle, host, port)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    async with server:
+        print(f"Serving on {', '.join(str(sock.getsockname()[:2]) for sock in server.sockets)}")
+        await stop.wait()
+    service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve PMC article summaries, PDFs and audio over HTTP")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=4, help="background generation threads")
+    parser.add_argument("--parse-workers", type=int, help="parser processes (default: CPU count)")
+    parser.add_argument("--pdf-processes", type=int,
+                        help="PDF layout processes (default: CPU count, 0 to render in the worker threads)")
+    parser.add_argument("--summarizer", help="extractive (default) or bart")
+    parser.add_argument("--tts", help="gtts (default) or offline")
+    args = parser.parse_args(argv)
+
+    resources = BatchResources(summarizer=get_summarizer(args.summarizer),
+                               tts=AudioSynthesizer(get_tts_backend(args.tts)))
+    service = SummaryService(resources, workers=args.workers, parse_workers=args.parse_workers,
+                             pdf_processes=args.pdf_processes)
+    asyncio.run(serve(service, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import re
+import threading
+import time
+
+# Sentence boundary shared by every component that splits article text. The
+# cheap one-character lookbehind is tried first so most positions fail fast.
+SENTENCE_BOUNDARY = r'(?<=[.?])(?<!\w\.\w.)(?<![A-Z][a-z]\.)\s'
+SENTENCE_RE = re.compile(SENTENCE_BOUNDARY)
+
+
+def complete_sentence(summary, max_word_count=50):
+    # Leading sentences of `summary` up to max_word_count words. Sentences
+    # are found lazily, so scanning stops at the first one over budget, and
+    # split() is capped at the remaining budget so a long sentence is never
+    # split into all of its words just to be rejected.
+    selected_sentences = []
+    remaining = max_word_count
+    start = 0
+    for match in SENTENCE_RE.finditer(summary):
+        sentence = summary[start:match.start()]
+        words = len(sentence.split(None, remaining))
+        if words > remaining:
+            return " ".join(selected_sentences)
+        selected_sentences.append(sentence)
+        remaining -= words
+        start = match.end()
+    sentence = summary[start:]
+    if len(sentence.split(None, remaining)) <= remaining:
+        selected_sentences.append(sentence)
+    return " ".join(selected_sentences)
+
+
+def complete_sentences(summaries, max_word_count=50):
+    return [complete_sentence(summary, max_word_count) for summary in summaries]
+
+
+class ExtractiveSummarizer:
+    # Keeps the leading sentences of a section up to a word budget
+    name = "extractive"
+
+    def __init__(self, max_word_count=50):
+        self.max_word_count = max_word_count
+
+    def config(self):
+        return {"max_word_count": self.max_word_count}
+
+    def summarize(self, text):
+        return complete_sentence(text, max_word_count=self.max_word_count)
+
+    def summarize_many(self, texts):
+        return complete_sentences(texts, max_word_count=self.max_word_count)
+
+
+class BartSummarizer:
+    # Abstractive summaries with BART; the model is only loaded on first use.
+    #
+    # summarize_many() splits every text into chunks that fit the model's
+    # 1024-token window, sorts all chunks by length and runs them through
+    # generate() in padded batches of similar length, so little compute is
+    # spent on padding. Chunk summaries of one text are joined in order.
+    name = "bart"
+
+    def __init__(self, model_name="facebook/bart-large-cnn", max_length=142, min_length=56, num_beams=4,
+                 batch_size=8, num_threads=None, quantize=False):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.min_length = min_length
+        self.num_beams = num_beams
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.quantize = quantize
+        self.stats = {"sections": 0, "chunks": 0, "batches": 0, "seconds": 0.0}
+        self._tokenizer = None
+        self._model = None
+        # Summarizer workers and service threads may all hit the first load
+        self._load_lock = threading.Lock()
+
+    def config(self):
+        # Only the settings that change the generated text
+        return {"model_name": self.model_name, "max_length": self.max_length, "min_length": self.min_length,
+                "num_beams": self.num_beams, "quantize": self.quantize}
+
+    def load(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    import torch
+                    from transformers import BartTokenizer, BartForConditionalGeneration
+
+                    if self.num_threads:
+                        torch.set_num_threads(self.num_threads)
+                    tokenizer = BartTokenizer.from_pretrained(self.model_name)
+                    model = BartForConditionalGeneration.from_pretrained(self.model_name).eval()
+                    if self.quantize:
+                        # Dynamic int8 quantization of the linear layers, CPU only
+                        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                    # The tokenizer is published first; other threads check _model
+                    self._tokenizer = tokenizer
+                    self._model = model
+        return self._tokenizer, self._model
+
+    def _chunks(self, text):
+        tokenizer, _ = self.load()
+        limit = min(tokenizer.model_max_length, 1024) - 2
+        ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+        return [[tokenizer.bos_token_id] + ids[start:start + limit] + [tokenizer.eos_token_id]
+                for start in range(0, len(ids), limit)]
+
+    def summarize_many(self, texts):
+        import torch
+
+        tokenizer, model = self.load()
+        chunks = []
+        for index, text in enumerate(texts):
+            if text.strip():
+                chunks.extend((index, order, ids) for order, ids in enumerate(self._chunks(text)))
+        chunks.sort(key=lambda chunk: len(chunk[2]))
+
+        outputs = {}
+        start = time.perf_counter()
+        with torch.inference_mode():
+            for offset in range(0, len(chunks), self.batch_size):
+                batch = chunks[offset:offset + self.batch_size]
+                inputs = tokenizer.pad({"input_ids": [ids for _, _, ids in batch]}, return_tensors="pt")
+                summary_ids = model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    num_beams=self.num_beams,
+                    max_length=self.max_length,
+                    min_length=self.min_length,
+                    early_stopping=True,
+                )
+                for (index, order, _), summary in zip(
+                        batch, tokenizer.batch_decode(summary_ids, skip_special_tokens=True)):
+                    outputs[index, order] = summary.strip()
+                self.stats["batches"] += 1
+        self.stats["seconds"] += time.perf_counter() - start
+        self.stats["sections"] += len(texts)
+        self.stats["chunks"] += len(chunks)
+
+        summaries = [[] for _ in texts]
+        for index, order in sorted(outputs):
+            summaries[index].append(outputs[index, order])
+        return [" ".join(parts) for parts in summaries]
+
+    def summarize(self, text):
+        return self.summarize_many([text])[0]
+
+    def throughput(self):
+        # Sections summarized per second of model time
+        return self.stats["sections"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
+
+
+class CachedSummarizer:
+    # Wraps a summarizer so each unique (text, backend, config) is only ever
+    # summarized once, across runs and output formats
+    def __init__(self, summarizer, cache=None):
+        from cache import SummaryCache
+
+        self.summarizer = summarizer
+        self.name = summarizer.name
+        self.cache = cache if cache is not None else SummaryCache()
+
+    def summarize_many(self, texts):
+        config = self.summarizer.config()
+        keys = [self.cache.key(text, self.name, config) for text in texts]
+        summaries = self.cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in summaries:
+                missing.setdefault(key, text)
+        if missing:
+            generated = self.summarizer.summarize_many(list(missing.values()))
+            summaries.update(zip(missing, generated))
+            self.cache.put_many(zip(missing, generated))
+        return [summaries[key] for key in keys]
+
+    def summarize(self, text):
+        return self.summarize_many([text])[0]
+
+
+SUMMARIZERS = {
+    ExtractiveSummarizer.name: ExtractiveSummarizer,
+    BartSummarizer.name: BartSummarizer,
+}
+
+
+def get_summarizer(name=None, **kwargs):
+    # Falls back to the SUMMARIZER environment variable, then to extractive
+    name = name or os.environ.get("SUMMARIZER", ExtractiveSummarizer.name)
+    try:
+        backend = SUMMARIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown summarizer '{name}', choose from: {', '.join(SUMMARIZERS)}")
+    return backend(**kwargs)
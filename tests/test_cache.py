@@ -0,0 +1,43 @@
+import os
+
+from cache import ArticleCache, content_digest
+
+
+def blob_files(cache):
+    return [name for _, _, files in os.walk(os.path.join(cache.path, "blobs")) for name in files]
+
+
+def test_changed_content_replaces_old_blob_and_parse_results(tmp_path):
+    cache = ArticleCache(str(tmp_path), max_bytes=3000)
+    for version in range(10):
+        content = bytes([version]) * 100
+        cache.store("PMC1", content)
+        cache.parse(content, lambda page: ("abstract", {"Methods": "text"}), key="rules")
+
+    assert blob_files(cache) == [content_digest(content)]
+    parsed = cache._db.execute("SELECT digest FROM parsed").fetchall()
+    assert parsed == [(f"{content_digest(content)}:rules",)]
+    cache.close()
+
+
+def test_old_blob_kept_while_another_id_refers_to_it(tmp_path):
+    cache = ArticleCache(str(tmp_path))
+    cache.store("PMC1", b"shared page")
+    cache.store("PMC2", b"shared page")
+    cache.store("PMC1", b"new page")
+
+    assert sorted(blob_files(cache)) == sorted([content_digest(b"shared page"), content_digest(b"new page")])
+    assert cache.lookup("PMC2")[0] == b"shared page"
+    cache.close()
+
+
+def test_evict_stays_within_limit(tmp_path):
+    cache = ArticleCache(str(tmp_path), max_bytes=250)
+    for number in range(5):
+        cache.store(f"PMC{number}", bytes([number]) * 100)
+
+    assert sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(os.path.join(cache.path, "blobs")) for name in files) <= 250
+    assert cache.lookup("PMC4") is not None
+    assert cache.lookup("PMC0") is None
+    cache.close()
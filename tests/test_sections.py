@@ -0,0 +1,51 @@
+from benchmarks.pmc_server import make_article_html
+from cache import ArticleCache
+from pmc_parser import parse_sections_content
+from sections import DEFAULT_CLASSIFIER, SectionClassifier
+
+PAGE = make_article_html("PMC9000001")
+
+
+def test_default_rules_drop_back_matter():
+    _, section_data = parse_sections_content(PAGE)
+    assert "Methods" in section_data
+    assert "Funding" not in section_data
+    assert "Competing interests" not in section_data
+
+
+def test_title_variants_and_merged_list_entries_are_unwanted():
+    for title in ("Associated Data", "Acknowledgments", "Funding information", "Conflicts of interest",
+                  "2. Authors’ Contributions", "REFERENCES"):
+        assert DEFAULT_CLASSIFIER.is_unwanted(title), title
+    for title in ("Methods", "Results", "Notes on methods"):
+        assert not DEFAULT_CLASSIFIER.is_unwanted(title), title
+
+
+def test_keep_rule_restores_default_excluded_section():
+    classifier = SectionClassifier(category_rules={"cardiology": {"keep": ["funding"]}})
+
+    _, section_data = parse_sections_content(PAGE, classifier=classifier, category="cardiology")
+    assert "Funding" in section_data
+    assert "Competing interests" not in section_data
+
+    _, section_data = parse_sections_content(PAGE, classifier=classifier, category="anesthesiology")
+    assert "Funding" not in section_data
+
+
+def test_parse_cache_is_keyed_by_rules(tmp_path):
+    cache = ArticleCache(str(tmp_path))
+    classifier = SectionClassifier(category_rules={"cardiology": {"keep": ["funding"]}})
+
+    _, default = cache.parse(PAGE, parse_sections_content, key=DEFAULT_CLASSIFIER.cache_key())
+    _, kept = cache.parse(PAGE, lambda content: parse_sections_content(content, classifier=classifier,
+                                                                        category="cardiology"),
+                          key=classifier.cache_key("cardiology"))
+    assert "Funding" not in default
+    assert "Funding" in kept
+    cache.close()
+
+
+def test_exclude_rule_applies_to_its_category_only():
+    classifier = SectionClassifier(category_rules={"cardiology": {"exclude": ["limitations"]}})
+    assert classifier.is_unwanted("Limitations", "cardiology")
+    assert not classifier.is_unwanted("Limitations", "anesthesiology")
@@ -0,0 +1,73 @@
+import random
+import re
+
+import pytest
+
+from benchmarks.pmc_server import make_article_html
+from pmc_parser import parse_sections_content
+from summarizer import SENTENCE_RE, ExtractiveSummarizer, complete_sentence, complete_sentences
+
+# The boundary pattern and algorithm complete_sentence started from
+ORIGINAL_BOUNDARY = r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s'
+
+
+def original_complete_sentence(summary, max_word_count=50):
+    sentences = re.split(ORIGINAL_BOUNDARY, summary)
+    word_count = 0
+    selected_sentences = []
+    for sentence in sentences:
+        words = sentence.split()
+        if word_count + len(words) <= max_word_count:
+            selected_sentences.append(sentence)
+            word_count += len(words)
+        else:
+            break
+    return " ".join(selected_sentences)
+
+
+# Abbreviations, initials, decimals, questions and odd whitespace around boundaries
+EDGE_CASES = [
+    "", " ", "One.", "One. ", " One. Two.", "No boundary at all", "Dr. Smith saw Mr. Jones. Then left.",
+    "e.g. this i.e. that. Next one? Yes.", "Dose was 2.5 mg. Then 0.5 mg.\nNew line. \tTab.",
+    "Ends with question? And more.  Double space.", "U.S. data. A. B. C. D.",
+    "word " * 60 + ". Short.", "Short. " + "word " * 60 + ".", "Trailing space.   ",
+]
+BUDGETS = (-1, 0, 1, 2, 5, 50, 400, 10 ** 6)
+
+
+def _methods_sections():
+    return [parse_sections_content(make_article_html(f"PMC{5000000 + index}", paragraphs_per_section=24,
+                                                     chrome=True))[1]["Methods"] for index in range(3)]
+
+
+@pytest.mark.parametrize("budget", BUDGETS)
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_complete_sentence_matches_original(text, budget):
+    assert complete_sentence(text, budget) == original_complete_sentence(text, budget)
+
+
+def test_complete_sentence_matches_original_on_long_methods_sections():
+    for text in _methods_sections():
+        for budget in BUDGETS:
+            assert complete_sentence(text, budget) == original_complete_sentence(text, budget)
+
+
+def test_complete_sentence_matches_original_on_random_mixtures():
+    rng = random.Random(0)
+    pieces = EDGE_CASES + ["x.", "?", "Ab.", "a.b.c", "\n", "  "]
+    for _ in range(1000):
+        text = " ".join(rng.choice(pieces) for _ in range(20))
+        budget = rng.randint(0, 80)
+        assert complete_sentence(text, budget) == original_complete_sentence(text, budget), (text, budget)
+
+
+def test_complete_sentences_matches_one_by_one():
+    texts = EDGE_CASES + _methods_sections()
+    assert complete_sentences(texts, 50) == [original_complete_sentence(text, 50) for text in texts]
+    assert ExtractiveSummarizer(max_word_count=20).summarize_many(texts) == \
+        [original_complete_sentence(text, 20) for text in texts]
+
+
+def test_shared_boundary_splits_like_the_original():
+    for text in EDGE_CASES + _methods_sections():
+        assert SENTENCE_RE.split(text) == re.split(ORIGINAL_BOUNDARY, text)